@@ -1,32 +1,16 @@
-from langchain_ollama import ChatOllama
-from langchain.agents import Tool, AgentExecutor, create_tool_calling_agent
-from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
+import threading
 from langgraph.graph import StateGraph
 from typing import TypedDict, List, Dict, Any
-from app.tools import validate_uploaded_pdfs, summarize_financials
-
-
-tools = [
-    Tool.from_function(
-        func=validate_uploaded_pdfs,
-        name="validate_uploaded_pdfs",
-        description="Validate uploaded financial PDFs using extracted income statements"
-    ),
-
-     Tool.from_function(func=summarize_financials, name="summarize_financials", description="testing prompts")
-]
-
-prompt = ChatPromptTemplate.from_messages([
-    ("system", "You are a financial document validation agent. Use the tool to validate PDFs."),
-    ("user", "{input}"),
-    MessagesPlaceholder(variable_name="agent_scratchpad")
-])
+from app.tools import validate_uploaded_pdfs, generate_summary
+from app.tracing import span
 
 class AgentState(TypedDict):
     input: str
     validation_requests: List[Dict[str, Any]]
     results: List[Dict[str, Any]]
     summary: str
+    summary_mode: str  # "none" | "template" | "llm" (default)
+    priority: str  # LLM scheduler lane: "interactive" (default) | "bulk"
 
 
 # def invoke_agent(state: AgentState) -> AgentState:
@@ -50,32 +34,52 @@ class AgentState(TypedDict):
     #What is api and it description
 
 def invoke_agent(state: AgentState) -> AgentState:
-    llm = ChatOllama(model="mistral")
-    agent = create_tool_calling_agent(llm=llm, tools=tools, prompt=prompt)
-    executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
-
+    # The tools are called directly; the only LLM call is the summary, which uses
+    # the shared client from app.llm, so nothing is constructed per request.
     raw_tool_fn = validate_uploaded_pdfs.func
-    output = raw_tool_fn(state["validation_requests"])
+    summary_mode = state.get("summary_mode") or "llm"
+    priority = state.get("priority") or "interactive"
+
+    with span("agent.invoke", files=len(state["validation_requests"]), summaryMode=summary_mode, priority=priority):
+        output = raw_tool_fn(state["validation_requests"])
 
-    summary = "Summary not available."
-    try:
-        summary_tool = summarize_financials.func
-        summary = summary_tool(output)
-    except Exception as e:
-        summary = f" Summary generation failed: {str(e)}"
+        summary = "Summary not available."
+        try:
+            summary = generate_summary(output, summary_mode, priority)
+        except Exception as e:
+            summary = f" Summary generation failed: {str(e)}"
 
     return {
         "input": state["input"],
         "validation_requests": state["validation_requests"],
         "results": output,
-        "summary": summary  
+        "summary": summary,
+        "summary_mode": summary_mode,
+        "priority": priority
     }
 
 
+def agent_response(state):
+    """The part of a finished run that is returned to clients: results and summary.
+
+    ``validation_requests`` stays internal; it holds server-side file paths.
+    """
+    return {"results": state["results"], "summary": state["summary"]}
+
+
+_compiled_agent = None
+_compiled_agent_lock = threading.Lock()
+
+
 def create_langgraph_agent():
-    graph = StateGraph(AgentState)
-    graph.add_node("invoke", invoke_agent)
-    graph.set_entry_point("invoke")
-    graph.set_finish_point("invoke")
-    return graph.compile()
+    """Compile the single-node graph once per process and reuse it."""
+    global _compiled_agent
+    with _compiled_agent_lock:
+        if _compiled_agent is None:
+            graph = StateGraph(AgentState)
+            graph.add_node("invoke", invoke_agent)
+            graph.set_entry_point("invoke")
+            graph.set_finish_point("invoke")
+            _compiled_agent = graph.compile()
+        return _compiled_agent
 
@@ -0,0 +1,139 @@
+import os
+from uuid import uuid4
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.config import EXPORT_DIR
+
+# Fixed column layout of exported validation rows; missing values are nulls
+RESULT_SCHEMA = pa.schema([
+    ("index", pa.int32()),
+    ("fileName", pa.string()),
+    ("quarter", pa.string()),
+    ("revenues", pa.float64()),
+    ("expenses", pa.float64()),
+    ("netIncome", pa.float64()),
+    ("submittedNetIncome", pa.float64()),
+    ("isValid", pa.bool_()),
+    ("processingTimeSeconds", pa.float64()),
+    ("stageTimingsSeconds", pa.map_(pa.string(), pa.float64())),
+    ("error", pa.string())
+])
+
+# Streamed responses use the Arrow IPC stream format; files use the random-access IPC file format
+COLUMNAR_MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet"
+}
+COLUMNAR_EXTENSIONS = {"arrow": ".arrow", "parquet": ".parquet"}
+PARQUET_ROW_GROUP_SIZE = 10000
+
+
+class ChunkSink:
+    """File-like sink that hands written bytes back as chunks for a streaming response."""
+
+    closed = False
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+# Step 1: Validation entries -> Arrow table with the fixed schema
+def entry_rows(entry):
+    """Rows of one bulk entry (``index``, ``fileName``, ``results``) in export layout."""
+    rows = []
+    for result in entry["results"]:
+        row = {name: result.get(name) for name in RESULT_SCHEMA.names}
+        row["index"] = entry.get("index")
+        row["fileName"] = result.get("fileName") or entry.get("fileName")
+        rows.append(row)
+    return rows
+
+
+def results_to_table(rows):
+    return pa.Table.from_pylist(rows, schema=RESULT_SCHEMA)
+
+
+# Step 2: Writers for both formats over any sink
+def open_writer(sink, format, stream=True):
+    if format == "parquet":
+        return pq.ParquetWriter(sink, RESULT_SCHEMA)
+    if stream:
+        return pa.ipc.new_stream(sink, RESULT_SCHEMA)
+    return pa.ipc.new_file(sink, RESULT_SCHEMA)
+
+
+def write_entries(writer, entries, format):
+    """Write entries as they arrive: one Arrow record batch per entry, Parquet row groups
+    of up to ``PARQUET_ROW_GROUP_SIZE`` rows. Yields after every write."""
+    pending = []
+    for entry in entries:
+        rows = entry_rows(entry)
+        if format == "parquet":
+            pending.extend(rows)
+            if len(pending) < PARQUET_ROW_GROUP_SIZE:
+                continue
+            rows, pending = pending, []
+        if rows:
+            writer.write_table(results_to_table(rows))
+            yield len(rows)
+    if pending:
+        writer.write_table(results_to_table(pending))
+        yield len(pending)
+
+
+def columnar_chunks(entries, format):
+    """Byte chunks of an Arrow IPC stream or Parquet file, produced while entries finish."""
+    sink = ChunkSink()
+    writer = open_writer(sink, format)
+    for _ in write_entries(writer, entries, format):
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+    writer.close()
+    yield sink.drain()
+
+
+# Step 3: Local files, confined to EXPORT_DIR
+def resolve_export_path(export_path, format, export_dir=EXPORT_DIR):
+    """Absolute path for ``export_path`` (relative to ``export_dir``); raises ValueError
+    for paths that would leave it."""
+    root = os.path.realpath(export_dir)
+    if not export_path.endswith(COLUMNAR_EXTENSIONS[format]):
+        export_path += COLUMNAR_EXTENSIONS[format]
+    path = os.path.realpath(os.path.join(root, export_path))
+    if os.path.commonpath([root, path]) != root or path == root:
+        raise ValueError(f"exportPath must stay inside the export directory: {export_path!r}")
+    return path
+
+
+def write_columnar_file(entries, format, path):
+    """Write entries to ``path`` atomically; returns the number of rows written."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid4().hex}.tmp"
+    row_count = 0
+    try:
+        with pa.OSFile(tmp_path, "wb") as sink:
+            writer = open_writer(sink, format, stream=False)
+            for written in write_entries(writer, entries, format):
+                row_count += written
+            writer.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return row_count
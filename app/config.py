@@ -0,0 +1,105 @@
+import os
+
+# Runtime settings, overridable through environment variables.
+
+# Docling document converters
+CONVERTER_POOL_SIZE = int(os.getenv("CONVERTER_POOL_SIZE", "2"))
+CONVERTER_BORROW_TIMEOUT = float(os.getenv("CONVERTER_BORROW_TIMEOUT", "300"))
+OCR_CONVERTER_POOL_SIZE = int(os.getenv("OCR_CONVERTER_POOL_SIZE", "1"))
+
+
+def _languages(value):
+    return tuple(lang.strip() for lang in value.split(",") if lang.strip())
+
+
+# OCR routing: a page is "scanned" when it has almost no text layer but is mostly covered by images
+OCR_MIN_TEXT_CHARS = int(os.getenv("OCR_MIN_TEXT_CHARS", "20"))
+OCR_MIN_IMAGE_COVERAGE = float(os.getenv("OCR_MIN_IMAGE_COVERAGE", "0.5"))
+OCR_MAX_PAGES = int(os.getenv("OCR_MAX_PAGES", "10"))
+# OCR settings per route: income statements (/validate, /jobs, ...) and /validate/invoices
+OCR_DPI = int(os.getenv("OCR_DPI", "200"))
+OCR_LANGUAGES = _languages(os.getenv("OCR_LANGUAGES", "en"))
+INVOICE_OCR_DPI = int(os.getenv("INVOICE_OCR_DPI", "150"))
+INVOICE_OCR_LANGUAGES = _languages(os.getenv("INVOICE_OCR_LANGUAGES", "en"))
+# OCR settings clients may request: DPIs snap to the nearest choice, languages must be allowed,
+# and at most OCR_CONVERTER_PROFILES OCR profiles keep their converters loaded
+OCR_DPI_CHOICES = tuple(sorted(int(dpi) for dpi in os.getenv("OCR_DPI_CHOICES", "100,150,200,300").split(",")))
+OCR_ALLOWED_LANGUAGES = _languages(os.getenv("OCR_ALLOWED_LANGUAGES", "en,de,fr,es,it,nl,pt"))
+OCR_CONVERTER_PROFILES = int(os.getenv("OCR_CONVERTER_PROFILES", "4"))
+
+# Content-addressed extraction cache (docling markdown + parsed rows)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+EXTRACTION_CACHE_ENABLED = os.getenv("EXTRACTION_CACHE_ENABLED", "1") == "1"
+EXTRACTION_CACHE_DIR = os.getenv("EXTRACTION_CACHE_DIR", os.path.join(BASE_DIR, "cache", "extractions"))
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+EXTRACTION_CACHE_MAX_ENTRIES = int(os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", "10000"))
+
+# Page-level cache of docling markdown, keyed by each page's content fingerprint
+PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE_ENABLED", "1") == "1"
+PAGE_CACHE_DIR = os.getenv("PAGE_CACHE_DIR", os.path.join(BASE_DIR, "cache", "pages"))
+PAGE_CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+PAGE_CACHE_MAX_ENTRIES = int(os.getenv("PAGE_CACHE_MAX_ENTRIES", "20000"))
+
+# Background validation jobs (/jobs)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_DEPTH = int(os.getenv("JOB_QUEUE_DEPTH", "16"))
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "3600"))
+
+# Per-file parallelism inside validate_uploaded_pdfs (1 = process files serially)
+VALIDATION_WORKERS = int(os.getenv("VALIDATION_WORKERS", "1"))
+VALIDATION_FILE_TIMEOUT = float(os.getenv("VALIDATION_FILE_TIMEOUT", "600"))
+
+# Page-level parallel conversion: statements longer than PAGE_SHARD_SIZE pages are split into
+# shards converted across PAGE_CONVERSION_WORKERS processes (1 = convert in one call)
+PAGE_CONVERSION_WORKERS = int(os.getenv("PAGE_CONVERSION_WORKERS", "1"))
+PAGE_SHARD_SIZE = max(1, int(os.getenv("PAGE_SHARD_SIZE", "4")))
+
+# Upload ingestion limits
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+MAX_UPLOAD_FILE_BYTES = int(os.getenv("MAX_UPLOAD_FILE_BYTES", str(100 * 1024 * 1024)))
+MAX_UPLOAD_REQUEST_BYTES = int(os.getenv("MAX_UPLOAD_REQUEST_BYTES", str(500 * 1024 * 1024)))
+
+# Per-request upload workspaces (tmpfs-backed when /dev/shm is available)
+WORKSPACE_ROOT = os.getenv("WORKSPACE_ROOT") or (
+    "/dev/shm/financial-agent" if os.access("/dev/shm", os.W_OK) else os.path.join(BASE_DIR, "temp")
+)
+WORKSPACE_MAX_AGE = float(os.getenv("WORKSPACE_MAX_AGE", str(3 * 60 * 60)))
+WORKSPACE_JANITOR_INTERVAL = float(os.getenv("WORKSPACE_JANITOR_INTERVAL", "300"))
+
+# Page screening (0 = scan every page)
+SCREENING_MAX_PAGES = int(os.getenv("SCREENING_MAX_PAGES", "0"))
+
+# Ollama LLM client (one shared, connection-pooled client per process)
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "mistral")
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL") or None
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "8"))
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "300"))
+
+# LLM summary cache: "sqlite", "disk" or "none"
+SUMMARY_CACHE_BACKEND = os.getenv("SUMMARY_CACHE_BACKEND", "sqlite")
+SUMMARY_CACHE_PATH = os.getenv("SUMMARY_CACHE_PATH", os.path.join(BASE_DIR, "cache", "summaries"))
+SUMMARY_CACHE_TTL = float(os.getenv("SUMMARY_CACHE_TTL", str(7 * 24 * 60 * 60)))
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "5000"))
+SUMMARY_CACHE_MAX_BYTES = int(os.getenv("SUMMARY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# LLM request scheduler (micro-batching window, concurrency bound)
+LLM_BATCH_WINDOW = float(os.getenv("LLM_BATCH_WINDOW", "0.05"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "2"))
+
+# Statement schemas: optional JSON file with extra/overriding schemas, and the enabled subset
+STATEMENT_SCHEMAS_FILE = os.getenv("STATEMENT_SCHEMAS_FILE") or None
+ENABLED_SCHEMAS = [s.strip() for s in os.getenv("ENABLED_SCHEMAS", "").split(",") if s.strip()]
+
+# Invoices: below this many text-layer characters, go straight to docling/OCR
+INVOICE_MIN_TEXT_CHARS = int(os.getenv("INVOICE_MIN_TEXT_CHARS", "50"))
+
+# Tracing: per-stage spans kept in memory (GET /traces) and stage histograms (GET /metrics)
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "1") == "1"
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "2048"))
+
+# Persistent document store (POST /documents); documents stay until deleted
+DOCUMENT_STORE_DIR = os.getenv("DOCUMENT_STORE_DIR", os.path.join(BASE_DIR, "store", "documents"))
+
+# Columnar exports of bulk results written with exportPath (paths are relative to this directory)
+EXPORT_DIR = os.getenv("EXPORT_DIR", os.path.join(BASE_DIR, "exports"))
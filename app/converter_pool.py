@@ -0,0 +1,171 @@
+import queue
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from docling.datamodel.base_models import InputFormat
+from docling.datamodel.pipeline_options import EasyOcrOptions, PdfPipelineOptions
+from docling.document_converter import DocumentConverter, PdfFormatOption
+
+from app.config import (
+    CONVERTER_POOL_SIZE,
+    CONVERTER_BORROW_TIMEOUT,
+    OCR_ALLOWED_LANGUAGES,
+    OCR_CONVERTER_POOL_SIZE,
+    OCR_CONVERTER_PROFILES,
+    OCR_DPI_CHOICES,
+)
+
+
+def pipeline_options(ocr=None):
+    """Docling PDF pipeline settings for one converter profile.
+
+    ``ocr`` is ``None`` for digitally born pages (text layer + table structure, no OCR)
+    or ``(dpi, languages)`` for scanned pages, which are OCR'd in full at that resolution.
+    """
+    options = PdfPipelineOptions()
+    options.do_table_structure = True
+    options.do_ocr = ocr is not None
+    if ocr is not None:
+        dpi, languages = ocr
+        # ``scale`` is the resolution pages are rendered at for OCR (72 DPI x scale)
+        options.ocr_options = EasyOcrOptions(lang=list(languages), force_full_page_ocr=True, scale=dpi / 72)
+    return options
+
+
+def ocr_profile(dpi, languages):
+    """Map client-requested OCR settings onto an allowed ``(dpi, languages)`` profile.
+
+    The DPI snaps to the nearest of ``OCR_DPI_CHOICES``; languages are deduplicated and
+    sorted, and unknown ones raise ValueError.
+    """
+    languages = tuple(sorted(set(languages)))
+    unknown = [lang for lang in languages if lang not in OCR_ALLOWED_LANGUAGES]
+    if not languages or unknown:
+        raise ValueError(f"ocrLanguages must be a non-empty subset of: {', '.join(OCR_ALLOWED_LANGUAGES)}")
+    return min(OCR_DPI_CHOICES, key=lambda choice: abs(choice - dpi)), languages
+
+
+def converter_factory(ocr=None):
+    options = pipeline_options(ocr)
+    return lambda: DocumentConverter(format_options={InputFormat.PDF: PdfFormatOption(pipeline_options=options)})
+
+
+class ConverterPool:
+    """Fixed-size pool of docling converters that are loaded once and lent to requests."""
+
+    def __init__(self, size=CONVERTER_POOL_SIZE, factory=DocumentConverter):
+        if size < 1:
+            raise ValueError("Converter pool size must be at least 1.")
+        self.size = size
+        self._factory = factory
+        self._idle = queue.Queue(maxsize=size)
+        self._lock = threading.Lock()
+        self._created = 0
+        self.ready = False
+
+    def _create(self):
+        converter = self._factory()
+        # Load the layout/table/OCR models now instead of on the first convert() call
+        converter.initialize_pipeline(InputFormat.PDF)
+        return converter
+
+    def _reserve_slot(self):
+        with self._lock:
+            if self._created >= self.size:
+                return False
+            self._created += 1
+            return True
+
+    def warm_up(self):
+        """Create every converter up front so no request pays for model loading."""
+        while self._reserve_slot():
+            self._idle.put(self._create())
+        self.ready = True
+
+    def acquire(self, timeout=CONVERTER_BORROW_TIMEOUT):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        if self._reserve_slot():
+            try:
+                return self._create()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No document converter became available within {timeout} seconds.")
+
+    def release(self, converter):
+        self._idle.put(converter)
+
+    @contextmanager
+    def borrow(self, timeout=CONVERTER_BORROW_TIMEOUT):
+        converter = self.acquire(timeout)
+        try:
+            yield converter
+        finally:
+            self.release(converter)
+
+
+# Profile -> pool; OCR profiles in least-recently-used order
+_pools = OrderedDict()
+_pool_lock = threading.Lock()
+# Set in pool worker processes, which run one task at a time
+_worker_process = False
+
+
+def in_worker_process():
+    """True inside validation, job and page-shard worker processes."""
+    return _worker_process
+
+
+def get_converter_pool(ocr=None):
+    """Return the process-wide pool for a profile, creating it lazily (converters load on first use).
+
+    The default profile converts digital pages without OCR; each ``(dpi, languages)``
+    OCR profile gets its own, smaller pool. Beyond ``OCR_CONVERTER_PROFILES`` OCR profiles
+    the least recently used one is dropped (converters on loan finish their work first).
+    """
+    key = None if ocr is None else (int(ocr[0]), tuple(ocr[1]))
+    with _pool_lock:
+        if key not in _pools:
+            if _worker_process:
+                size = 1
+            else:
+                size = CONVERTER_POOL_SIZE if key is None else OCR_CONVERTER_POOL_SIZE
+            _pools[key] = ConverterPool(size, converter_factory(key))
+        _pools.move_to_end(key)
+        ocr_keys = [profile for profile in _pools if profile is not None]
+        for profile in ocr_keys[:max(0, len(ocr_keys) - OCR_CONVERTER_PROFILES)]:
+            del _pools[profile]
+        return _pools[key]
+
+
+def drop_converter_pools():
+    """Forget every pool, so the next use loads fresh converters (cold-start benchmarks)."""
+    with _pool_lock:
+        _pools.clear()
+
+
+def init_converter_pool():
+    """Create the process-wide digital pool and load its converters. Called from the app lifespan.
+
+    OCR pools are only loaded once a scanned page actually needs them.
+    """
+    pool = get_converter_pool()
+    pool.warm_up()
+    print(f"✅ Warmed {pool.size} document converter(s)")
+    return pool
+
+
+def init_worker_converter_pool():
+    """Process-pool initializer: a worker converts one file or shard at a time, so it
+    loads a single converter per profile instead of ``CONVERTER_POOL_SIZE``."""
+    global _worker_process
+    _worker_process = True
+    return init_converter_pool()
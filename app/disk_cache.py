@@ -0,0 +1,124 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from uuid import uuid4
+
+
+# Eviction trims the cache to this share of its limits, so rescans stay rare
+EVICTION_HEADROOM = 0.9
+
+
+class DiskLRUCache:
+    """JSON cache on local disk with least-recently-used, size-bounded eviction.
+
+    Entries live in ``<directory>/<key[:2]>/<key>.json``. A hit bumps the file's
+    mtime, so eviction removes the entries that were used longest ago first.
+
+    Sizes and LRU order are kept in memory, so reads and writes are O(1). The
+    directory is only scanned once on first use and again when the running totals
+    cross a limit (which also picks up entries written by other processes); eviction
+    then trims to ``EVICTION_HEADROOM`` of the limits.
+    """
+
+    def __init__(self, directory, max_bytes, max_entries=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._index = None  # path -> size, least recently used first
+        self._total = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _scan(self):
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        self._index = OrderedDict((path, size) for _, size, path in entries)
+        self._total = sum(self._index.values())
+
+    def _ensure_index(self):
+        if self._index is None:
+            self._scan()
+
+    def _over(self, share=1.0):
+        over_size = self._total > self.max_bytes * share
+        over_count = self.max_entries is not None and len(self._index) > self.max_entries * share
+        return over_size or over_count
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # Corrupt or half-written entry: drop it and treat as a miss
+            self._forget(path)
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            if self._index is not None and path in self._index:
+                self._index.move_to_end(path)
+        return value
+
+    def set(self, key, value):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+            size = f.tell()
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._ensure_index()
+            self._total += size - self._index.pop(path, 0)
+            self._index[path] = size
+            needs_eviction = self._over()
+        if needs_eviction:
+            self.evict()
+
+    def delete(self, key):
+        path = self._path(key)
+        self._forget(path)
+        self._remove(path)
+
+    def _forget(self, path):
+        with self._lock:
+            if self._index is not None:
+                self._total -= self._index.pop(path, 0)
+
+    def evict(self):
+        """Remove least-recently-used entries until the cache is back under its limits."""
+        with self._lock:
+            self._scan()
+            if not self._over():
+                return
+            while self._index and self._over(EVICTION_HEADROOM):
+                path, size = self._index.popitem(last=False)
+                self._remove(path)
+                self._total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,105 @@
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from uuid import uuid4
+
+import fitz  # PyMuPDF
+
+from app.config import DOCUMENT_STORE_DIR, SCREENING_MAX_PAGES
+from app.page_screening import screen_schemas
+from app.schemas import enabled_schemas, registry_fingerprint
+from app.uploads import original_filename, remove_quietly
+
+# Document IDs are the SHA-256 of the PDF bytes
+DOCUMENT_ID_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+class DocumentStore:
+    """Content-addressed store of uploaded PDFs and their screening metadata.
+
+    ``<directory>/<id[:2]>/<id>.pdf`` holds the bytes and ``<id>.json`` the metadata
+    (original name, size, page count, schema, matched statement pages). Storing the
+    same bytes twice keeps one copy.
+    """
+
+    def __init__(self, directory=DOCUMENT_STORE_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _base(self, document_id):
+        if not DOCUMENT_ID_PATTERN.match(document_id or ""):
+            raise ValueError(f"Invalid document ID: {document_id!r}")
+        return os.path.join(self.directory, document_id[:2], document_id)
+
+    def pdf_path(self, document_id):
+        return self._base(document_id) + ".pdf"
+
+    def get(self, document_id):
+        """Metadata of a stored document, or None."""
+        try:
+            with open(self._base(document_id) + ".json", "r", encoding="utf-8") as f:
+                metadata = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return metadata if os.path.exists(self.pdf_path(document_id)) else None
+
+    def _write_metadata(self, document_id, metadata):
+        path = self._base(document_id) + ".json"
+        tmp_path = f"{path}.{uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+        os.replace(tmp_path, path)
+
+    def add(self, upload_path, content_hash, file_name):
+        """Move an ingested upload (already hashed and PDF-checked) into the store.
+
+        The document is screened once here; its schema and matched pages are kept so
+        validations by ID can skip re-screening.
+        """
+        existing = self.get(content_hash)
+        if existing is not None:
+            remove_quietly(upload_path)
+            return existing
+
+        with fitz.open(upload_path) as doc:
+            page_count = len(doc)
+            schema_name, matched_pages = screen_schemas(doc, enabled_schemas(), max_pages=SCREENING_MAX_PAGES)
+        metadata = {
+            "documentId": content_hash,
+            "fileName": original_filename(os.path.basename(file_name)),
+            "size": os.path.getsize(upload_path),
+            "pageCount": page_count,
+            "schema": schema_name,
+            "matchedPages": matched_pages,
+            "registryFingerprint": registry_fingerprint(),
+            "storedAt": time.time()
+        }
+
+        pdf_path = self.pdf_path(content_hash)
+        os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
+        with self._lock:
+            tmp_path = f"{pdf_path}.{uuid4().hex}.tmp"
+            shutil.move(upload_path, tmp_path)
+            os.replace(tmp_path, pdf_path)
+            self._write_metadata(content_hash, metadata)
+        return metadata
+
+    def delete(self, document_id):
+        with self._lock:
+            existed = self.get(document_id) is not None
+            remove_quietly(self.pdf_path(document_id))
+            remove_quietly(self._base(document_id) + ".json")
+        return existed
+
+    def page_hints(self, metadata):
+        """Stored matched pages, if they were screened with the current schema registry."""
+        if metadata.get("registryFingerprint") != registry_fingerprint():
+            return None
+        return metadata.get("matchedPages")
+
+
+document_store = DocumentStore()
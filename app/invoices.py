@@ -0,0 +1,222 @@
+import os
+import re
+import time
+
+import fitz  # PyMuPDF
+
+from app.config import INVOICE_MIN_TEXT_CHARS, INVOICE_OCR_DPI, INVOICE_OCR_LANGUAGES
+from app.converter_pool import get_converter_pool
+from app.page_screening import find_scanned_pages
+from app.tracing import span
+
+# Amounts such as "Rs. 1,250.00", "₹ 623.00", "-0.50" or "12,500"
+AMOUNT_PATTERN = re.compile(r"(?:Rs\.?|₹)?\s*(-?[\d,]+\.\d{2}|\d{1,3}(?:,\d{3})+)")
+QUANTITY_PATTERN = re.compile(r"[\d,]+\.\d+|\d+")
+
+TOTAL_KEYWORDS = ["net amount", "grand total", "total amount", "total", "invoice total", "amount due", "balance due"]
+TAX_KEYWORDS = ["tax amount", "gst", "cgst", "sgst", "igst"]
+TAXABLE_KEYWORDS = ["taxable amount", "taxable value"]
+QUANTITY_KEYWORDS = ["qty", "quantity", "units"]
+
+
+def keyword_pattern(keywords):
+    return re.compile("|".join(re.escape(k) for k in keywords), re.IGNORECASE)
+
+
+TOTAL_PATTERN = keyword_pattern(TOTAL_KEYWORDS)
+TAX_PATTERN = keyword_pattern(TAX_KEYWORDS)
+TAXABLE_PATTERN = keyword_pattern(TAXABLE_KEYWORDS)
+QUANTITY_LABEL_PATTERN = keyword_pattern(QUANTITY_KEYWORDS)
+SUBTOTAL_PATTERN = re.compile("subtotal", re.IGNORECASE)
+
+# Words whose vertical midpoints are this close (in points) belong to the same text line
+LINE_TOLERANCE = 3.0
+
+
+# Step 1: Extract numeric value from a line (supports ₹, Rs., commas, decimals)
+def extract_number(line):
+    match = AMOUNT_PATTERN.search(line)
+    if match:
+        try:
+            return float(match.group(1).replace(",", ""))
+        except ValueError:
+            return 0.0
+    return 0.0
+
+
+# Step 2: Totals from text lines (docling markdown or the PDF text layer)
+def extract_invoice_totals(lines):
+    totals = {
+        "taxableAmount": 0.0,
+        "taxAmount": 0.0,
+        "totalAmount": 0.0,
+        "effectiveTaxRate": 0.0,
+        "lineItemSum": 0.0,
+        "lineItemDiscrepancy": 0.0,
+        "quantity": 0.0,
+        "totalFromLabel": False
+    }
+    largest = None
+
+    for line in lines:
+        clean = line.strip()
+        if not clean:
+            continue
+
+        if TAXABLE_PATTERN.search(clean):
+            totals["taxableAmount"] = extract_number(clean)
+        elif TAX_PATTERN.search(clean):
+            totals["taxAmount"] = extract_number(clean)
+        elif TOTAL_PATTERN.search(clean):
+            if not SUBTOTAL_PATTERN.search(clean):
+                total = extract_number(clean)
+                if total > totals["totalAmount"]:
+                    totals["totalAmount"] = total
+                    totals["totalFromLabel"] = True
+        elif QUANTITY_LABEL_PATTERN.search(clean):
+            qty_match = QUANTITY_PATTERN.search(clean)
+            if qty_match:
+                totals["quantity"] = float(qty_match.group(0).replace(",", ""))
+
+        matches = [float(m.replace(",", "")) for m in AMOUNT_PATTERN.findall(clean)]
+        if len(matches) >= 3:
+            totals["lineItemSum"] += matches[-1]
+        if matches:
+            largest = max(matches) if largest is None else max(largest, max(matches))
+
+    if totals["totalAmount"] == 0 and largest is not None:
+        totals["totalAmount"] = largest
+
+    if totals["taxableAmount"] > 0:
+        totals["effectiveTaxRate"] = round((totals["taxAmount"] / totals["taxableAmount"]) * 100, 2)
+
+    totals["lineItemSum"] = round(totals["lineItemSum"], 2)
+    totals["lineItemDiscrepancy"] = round(totals["lineItemSum"] - totals["totalAmount"], 2)
+    return totals
+
+
+def extract_invoice_totals_from_markdown(markdown):
+    return extract_invoice_totals(markdown.splitlines())
+
+
+# Step 3: How far the extracted totals can be trusted
+def invoice_confidence(totals):
+    """``high`` when the total reconciles with taxable + tax or the line items,
+    ``medium`` when it comes from a total label, ``low`` otherwise."""
+    total = totals["totalAmount"]
+    if total <= 0 or not totals["totalFromLabel"]:
+        return "low"
+    if totals["taxableAmount"] > 0 and abs(totals["taxableAmount"] + totals["taxAmount"] - total) < 1:
+        return "high"
+    if abs(totals["lineItemDiscrepancy"]) < 1:
+        return "high"
+    return "medium"
+
+
+# Step 4: Rebuild visual lines from the text layer so table rows stay on one line
+def page_text_lines(page):
+    lines = []
+    current_y, current_words = None, []
+    for x0, y0, x1, y1, word, *_ in page.get_text("words", sort=True):
+        y = (y0 + y1) / 2
+        if current_words and abs(y - current_y) > LINE_TOLERANCE:
+            lines.append(" ".join(w for _, w in sorted(current_words)))
+            current_words = []
+        if not current_words:
+            current_y = y
+        current_words.append((x0, word))
+    if current_words:
+        lines.append(" ".join(w for _, w in sorted(current_words)))
+    return lines
+
+
+def extract_text_layer_lines(pdf_path):
+    """Returns ``(lines, char_count, page_count)`` from the PDF's embedded text."""
+    with fitz.open(pdf_path) as doc:
+        lines = []
+        for page in doc:
+            lines.extend(page_text_lines(page))
+        return lines, sum(len(line) for line in lines), len(doc)
+
+
+def extract_docling_markdown(pdf_path, ocr=None):
+    with get_converter_pool(ocr=ocr).borrow() as converter:
+        with span("docling.convert", ocr=ocr is not None):
+            result = converter.convert(pdf_path)
+    return result.document.export_to_markdown(), len(result.document.pages)
+
+
+# Step 5: Fast path first; docling only for missing text or low confidence, OCR only for scans
+def extract_invoice(
+    pdf_path,
+    min_text_chars=INVOICE_MIN_TEXT_CHARS,
+    ocr_dpi=INVOICE_OCR_DPI,
+    ocr_languages=INVOICE_OCR_LANGUAGES
+):
+    with span("invoice.text_layer") as text_layer:
+        lines, char_count, page_count = extract_text_layer_lines(pdf_path)
+        text_layer.set_attributes({"chars": char_count, "pageCount": page_count})
+        if char_count >= min_text_chars:
+            totals = extract_invoice_totals(lines)
+            confidence = invoice_confidence(totals)
+            text_layer.set_attribute("confidence", confidence)
+            if confidence != "low":
+                return totals, "text", confidence, page_count
+
+    # Digital invoices with unusual layouts skip OCR; scans are OCR'd with this route's settings
+    scanned = bool(find_scanned_pages(pdf_path, max_pages=1))
+    ocr = (ocr_dpi, ocr_languages) if scanned else None
+    markdown, page_count = extract_docling_markdown(pdf_path, ocr)
+    totals = extract_invoice_totals_from_markdown(markdown)
+    return totals, "ocr" if scanned else "docling", invoice_confidence(totals), page_count
+
+
+# Step 6: Compare against submitted amount
+def validate_invoice_totals(calculated, submitted_amount):
+    return {
+        "submittedAmount": submitted_amount,
+        "calculatedTaxable": calculated["taxableAmount"],
+        "calculatedTax": calculated["taxAmount"],
+        "calculatedTotal": calculated["totalAmount"],
+        "effectiveTaxRatePercent": calculated["effectiveTaxRate"],
+        "lineItemSum": calculated["lineItemSum"],
+        "lineItemDiscrepancy": calculated["lineItemDiscrepancy"],
+        "quantity": calculated["quantity"],
+        "matchWithSubmission": abs(submitted_amount - calculated["totalAmount"]) < 1,
+    }
+
+
+# Step 7: Validate one invoice, turning failures into an error entry
+def validate_invoice(
+    pdf_path,
+    submitted_amount,
+    file_name=None,
+    ocr_dpi=INVOICE_OCR_DPI,
+    ocr_languages=INVOICE_OCR_LANGUAGES
+):
+    start = time.time()
+    file_name = file_name or os.path.basename(pdf_path)
+    with span("invoice.validate", fileName=file_name) as invoice_span:
+        try:
+            totals, method, confidence, page_count = extract_invoice(
+                pdf_path, ocr_dpi=ocr_dpi, ocr_languages=ocr_languages
+            )
+        except Exception as e:
+            invoice_span.set_attribute("error", str(e))
+            return {"fileName": file_name, "error": str(e)}
+        invoice_span.set_attribute("extractionMethod", method)
+    validation = validate_invoice_totals(totals, submitted_amount)
+    validation["fileName"] = file_name
+    validation["extractionMethod"] = method
+    validation["confidence"] = confidence
+    validation["pageCount"] = page_count
+    validation["processingTimeSeconds"] = round(time.time() - start, 4)
+    return validation
+
+
+def validate_invoices(invoice_requests, ocr_dpi=INVOICE_OCR_DPI, ocr_languages=INVOICE_OCR_LANGUAGES):
+    """``invoice_requests``: dicts with ``fileName``, ``filePath`` and ``submittedAmount``."""
+    return [
+        validate_invoice(req["filePath"], req["submittedAmount"], req["fileName"], ocr_dpi, ocr_languages)
+        for req in invoice_requests
+    ]
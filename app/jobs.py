@@ -0,0 +1,198 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from uuid import uuid4
+
+from app.config import JOB_WORKERS, JOB_QUEUE_DEPTH, JOB_RESULT_TTL
+from app.tracing import collect_stage_observations, replay_stage_observations
+
+
+class JobQueueFullError(Exception):
+    """Raised when the number of unfinished jobs has reached the queue-depth limit."""
+
+
+# ---------- Worker process side ----------
+_worker_agent = None
+
+
+def init_job_worker():
+    """Process-pool initializer: warm this worker's converter and build its agent once."""
+    global _worker_agent
+    from app.agent import create_langgraph_agent
+    from app.converter_pool import init_worker_converter_pool
+
+    init_worker_converter_pool()
+    _worker_agent = create_langgraph_agent()
+
+
+def run_validation_job(validation_requests):
+    """Worker task: validate the files only. The summary is written in the API process.
+
+    Returns the agent's response and the stage observations of this job's spans.
+    """
+    global _worker_agent
+    if _worker_agent is None:
+        from app.agent import create_langgraph_agent
+        _worker_agent = create_langgraph_agent()
+    from app.agent import agent_response
+    with collect_stage_observations() as observations:
+        output = agent_response(_worker_agent.invoke({
+            "input": "Validate uploaded PDFs.",
+            "validation_requests": validation_requests,
+            "results": [],
+            "summary_mode": "none"
+        }))
+    return output, observations
+
+
+def job_error(future):
+    if future.cancelled():
+        return "Job was cancelled."
+    error = future.exception()
+    if isinstance(error, BrokenProcessPool):
+        return "The job's worker process exited unexpectedly; submit the job again."
+    return str(error)
+
+
+# ---------- API process side ----------
+class JobManager:
+    """Runs validation jobs on a bounded process pool and keeps their results for polling."""
+
+    def __init__(self, max_workers=JOB_WORKERS, max_queue_depth=JOB_QUEUE_DEPTH, result_ttl=JOB_RESULT_TTL):
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self.result_ttl = result_ttl
+        self._executor = None
+        # Summaries go through this process's LLM scheduler in the bulk lane, so they
+        # queue behind interactive /validate summaries and share its concurrency bound
+        self._summaries = None
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _ensure_executor(self):
+        # Caller holds the lock
+        if self._executor is None:
+            # spawn: never fork a server process that already holds torch/docling state
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_job_worker
+            )
+        return self._executor
+
+    def _discard_executor(self, executor):
+        """Drop a pool that broke because a worker died (OOM, crash in native code).
+
+        Its jobs have already failed; the next submit starts a fresh pool. Caller holds the lock.
+        """
+        if self._executor is executor:
+            self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def start(self):
+        with self._lock:
+            self._ensure_executor()
+
+    def _summary_executor(self):
+        with self._lock:
+            if self._summaries is None:
+                self._summaries = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job-summary")
+            return self._summaries
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            summaries, self._summaries = self._summaries, None
+        if summaries is not None:
+            summaries.shutdown(wait=False, cancel_futures=True)
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _purge_expired(self):
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["finishedAt"] is not None and now - job["finishedAt"] > self.result_ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def pending_count(self):
+        return sum(1 for job in self._jobs.values() if job["finishedAt"] is None)
+
+    def has_capacity(self):
+        with self._lock:
+            return self.pending_count() < self.max_queue_depth
+
+    def submit(self, validation_requests, summary_mode="llm", on_finish=None):
+        """Queue a validation run; ``on_finish`` is called once its files are validated."""
+        with self._lock:
+            self._purge_expired()
+            if self.pending_count() >= self.max_queue_depth:
+                raise JobQueueFullError(f"{self.max_queue_depth} jobs are already queued or running.")
+            job_id = uuid4().hex
+            executor = self._ensure_executor()
+            try:
+                future = executor.submit(run_validation_job, validation_requests)
+            except BrokenProcessPool:
+                # A worker died since the last submit and its callbacks have not run yet
+                self._discard_executor(executor)
+                executor = self._ensure_executor()
+                future = executor.submit(run_validation_job, validation_requests)
+            job = {"jobId": job_id, "future": future, "createdAt": time.time(), "finishedAt": None}
+            self._jobs[job_id] = job
+
+        def validated(done):
+            failed = done.cancelled() or done.exception() is not None
+            if not done.cancelled() and isinstance(done.exception(), BrokenProcessPool):
+                # Only the jobs that were on the broken pool fail; later jobs get a new one
+                with self._lock:
+                    self._discard_executor(executor)
+            if on_finish is not None:
+                on_finish()
+            if failed:
+                job["error"] = job_error(done)
+                job["finishedAt"] = time.time()
+                return
+            output, observations = done.result()
+            # Job workers trace in their own process; their spans still reach /metrics
+            replay_stage_observations(observations)
+            self._summary_executor().submit(self._summarize, job, output, summary_mode)
+
+        future.add_done_callback(validated)
+        return self.describe(job)
+
+    @staticmethod
+    def _summarize(job, output, summary_mode):
+        from app.tools import generate_summary
+        try:
+            output["summary"] = generate_summary(output["results"], summary_mode, priority="bulk")
+        except Exception as e:
+            output["summary"] = f" Summary generation failed: {str(e)}"
+        job["result"] = output
+        job["finishedAt"] = time.time()
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return self.describe(job) if job is not None else None
+
+    @staticmethod
+    def describe(job):
+        future = job["future"]
+        info = {"jobId": job["jobId"], "createdAt": job["createdAt"], "finishedAt": job["finishedAt"]}
+        if job["finishedAt"] is None:
+            # Validated jobs stay "running" while their summary is written
+            info["status"] = "running" if future.running() or future.done() else "queued"
+        elif "error" in job:
+            info["status"] = "failed"
+            info["error"] = job["error"]
+        else:
+            info["status"] = "completed"
+            info["result"] = job["result"]
+        return info
+
+
+job_manager = JobManager()
@@ -0,0 +1,46 @@
+import threading
+
+import httpx
+from langchain_ollama import ChatOllama
+
+from app.config import (
+    OLLAMA_MODEL,
+    OLLAMA_BASE_URL,
+    OLLAMA_KEEP_ALIVE,
+    OLLAMA_MAX_CONNECTIONS,
+    OLLAMA_TIMEOUT,
+)
+
+_llm = None
+_llm_lock = threading.Lock()
+
+
+def create_llm():
+    """Build a ChatOllama client whose HTTP connections are pooled and kept alive."""
+    return ChatOllama(
+        model=OLLAMA_MODEL,
+        base_url=OLLAMA_BASE_URL,
+        # Keep the model loaded in Ollama between requests
+        keep_alive=OLLAMA_KEEP_ALIVE,
+        client_kwargs={
+            "timeout": OLLAMA_TIMEOUT,
+            "limits": httpx.Limits(
+                max_connections=OLLAMA_MAX_CONNECTIONS,
+                max_keepalive_connections=OLLAMA_MAX_CONNECTIONS
+            )
+        }
+    )
+
+
+def get_llm():
+    """Return the process-wide LLM client, creating it on first use."""
+    global _llm
+    with _llm_lock:
+        if _llm is None:
+            _llm = create_llm()
+        return _llm
+
+
+def init_llm():
+    """Create the shared LLM client up front. Called from the app lifespan."""
+    return get_llm()
@@ -0,0 +1,112 @@
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from langchain_core.messages import HumanMessage
+
+from app.config import LLM_BATCH_WINDOW, LLM_MAX_CONCURRENCY
+from app.llm import get_llm
+
+# Lower value = served first
+PRIORITY_LANES = {"interactive": 0, "bulk": 1}
+
+
+class SummaryScheduler:
+    """Micro-batching front door for LLM calls.
+
+    Requests are queued by lane (interactive before bulk). A collector thread gathers
+    requests arriving within ``window`` seconds, coalesces identical prompts into a
+    single LLM call, and dispatches at most ``max_concurrency`` calls at a time; the
+    backlog stays in the priority queue so interactive work overtakes queued bulk work.
+    Each caller gets a Future with its own response text.
+    """
+
+    def __init__(self, window=LLM_BATCH_WINDOW, max_concurrency=LLM_MAX_CONCURRENCY, llm_factory=get_llm):
+        self.window = window
+        self.max_concurrency = max_concurrency
+        self._llm_factory = llm_factory
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._slots = threading.Semaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm")
+        self._collector = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, prompt, priority="interactive"):
+        if priority not in PRIORITY_LANES:
+            raise ValueError(f"Unknown priority lane: {priority}")
+        future = Future()
+        self._queue.put((PRIORITY_LANES[priority], next(self._sequence), prompt, future))
+        self._ensure_started()
+        return future
+
+    def stream(self, prompt):
+        """Yield the response to ``prompt`` chunk by chunk, holding one concurrency slot.
+
+        Streams are not batched, but they count against ``max_concurrency`` like any call.
+        """
+        with self._slots:
+            for chunk in self._llm_factory().stream([HumanMessage(content=prompt)]):
+                if chunk.content:
+                    yield chunk.content
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._collector is None:
+                self._collector = threading.Thread(target=self._collect_forever, name="llm-scheduler", daemon=True)
+                self._collector.start()
+
+    def _collect_forever(self):
+        while True:
+            self._slots.acquire()
+            _, _, prompt, future = self._queue.get()
+            batch = {prompt: [future]}
+            deadline = time.monotonic() + self.window
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                lane, sequence, prompt, future = item
+                if prompt in batch:
+                    batch[prompt].append(future)
+                elif self._slots.acquire(blocking=False):
+                    batch[prompt] = [future]
+                else:
+                    # No free slot: leave it queued (same lane and position) for the next round
+                    self._queue.put(item)
+                    break
+            for prompt, futures in batch.items():
+                self._executor.submit(self._call, prompt, futures)
+
+    def _call(self, prompt, futures):
+        try:
+            futures = [f for f in futures if f.set_running_or_notify_cancel()]
+            if not futures:
+                return
+            response = self._llm_factory().invoke([HumanMessage(content=prompt)])
+            for future in futures:
+                future.set_result(response.content)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._slots.release()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_summary_scheduler():
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = SummaryScheduler()
+        return _scheduler
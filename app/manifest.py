@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+import re
+
+MANIFEST_FIELDS = ("fileName", "contentHash", "submittedNetIncome")
+CONTENT_HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _text(row, field, line):
+    value = row.get(field)
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"Manifest entry {line} has a non-text {field}.")
+    return value.strip() or None
+
+
+def _parse_amount(value):
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    return float(str(value).replace(",", ""))
+
+
+def parse_manifest(content: bytes, filename=""):
+    """Parse a bulk-validation manifest (JSON or CSV) into a list of entries.
+
+    Each entry references an uploaded file by ``fileName`` or a previously validated
+    document by ``contentHash`` (SHA-256), with its own ``submittedNetIncome``. JSON
+    may be a list of objects or ``{"entries": [...]}``; CSV needs a header row with
+    the same column names. Raises ValueError on malformed input.
+    """
+    text = content.decode("utf-8-sig").strip()
+    if not text:
+        raise ValueError("Manifest is empty.")
+
+    if filename.lower().endswith(".json") or text[0] in "[{":
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Manifest is not valid JSON: {e}")
+        rows = data.get("entries") if isinstance(data, dict) else data
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValueError("JSON manifest must be a list of objects or {\"entries\": [...]}.")
+    else:
+        rows = list(csv.DictReader(io.StringIO(text)))
+
+    entries = []
+    for line, row in enumerate(rows, start=1):
+        file_name = _text(row, "fileName", line)
+        content_hash = _text(row, "contentHash", line)
+        if not file_name and not content_hash:
+            raise ValueError(f"Manifest entry {line} needs a fileName or a contentHash.")
+        if content_hash:
+            content_hash = content_hash.lower()
+            if not CONTENT_HASH_PATTERN.match(content_hash):
+                raise ValueError(f"Manifest entry {line} has an invalid contentHash (expected a SHA-256 hex digest).")
+        try:
+            submitted = _parse_amount(row.get("submittedNetIncome"))
+        except (TypeError, ValueError):
+            raise ValueError(f"Manifest entry {line} has an invalid submittedNetIncome.")
+        entries.append({"fileName": file_name, "contentHash": content_hash, "submittedNetIncome": submitted})
+    if not entries:
+        raise ValueError("Manifest has no entries.")
+    return entries
@@ -0,0 +1,150 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from app.uploads import original_filename
+
+# Period labels seen in statement headers: "Q3 FY25", "Q3FY2025", "FY25Q3", "Q1 2025"
+PERIOD_PATTERNS = [
+    r"Q(?P<q>[1-4])\s*FY\s*(?P<y>\d{2,4})",
+    r"FY\s*(?P<y>\d{2,4})\s*Q(?P<q>[1-4])",
+    r"Q(?P<q>[1-4])\s*(?P<y>\d{4})",
+]
+
+METRIC_COLUMNS = [
+    "fileName", "quarter", "revenues", "expenses", "netIncome",
+    "submittedNetIncome", "isValid",
+]
+
+
+def _period_ordinal(quarters):
+    """Vectorised quarter label -> running quarter number (year * 4 + quarter - 1); NaN if unknown."""
+    ordinal = pd.Series(np.nan, index=quarters.index)
+    labels = quarters.fillna("").astype(str)
+    for pattern in PERIOD_PATTERNS:
+        parts = labels.str.extract(pattern, flags=re.IGNORECASE)
+        year = pd.to_numeric(parts["y"], errors="coerce")
+        year = year.where(year >= 100, year + 2000)
+        found = year * 4 + pd.to_numeric(parts["q"], errors="coerce") - 1
+        ordinal = ordinal.fillna(found)
+    return ordinal
+
+
+def _growth_percent(current, previous):
+    growth = (current - previous) / previous.abs() * 100
+    return growth.where(previous.notna() & (previous != 0)).round(2)
+
+
+def compute_metrics(results):
+    """Margins, QoQ/YoY net income growth and validation status for every parsed row.
+
+    Error entries are ignored. Growth compares each row with the row for the previous
+    quarter (QoQ) or the same quarter one year earlier (YoY) from the same file; it is
+    n/a when that file has no such period, or several tables for it (e.g. consolidated
+    and standalone), since the baseline would be ambiguous.
+    """
+    # Works for result dicts and ValidationRow records alike
+    rows = [[r.get(column) for column in METRIC_COLUMNS] for r in results if "error" not in r]
+    df = pd.DataFrame(rows, columns=METRIC_COLUMNS)
+    if df.empty:
+        return df.assign(profitMarginPercent=[], qoqGrowthPercent=[], yoyGrowthPercent=[], period=[])
+
+    for column in ["revenues", "expenses", "netIncome", "submittedNetIncome"]:
+        df[column] = pd.to_numeric(df[column], errors="coerce")
+
+    revenues = df["revenues"]
+    df["profitMarginPercent"] = (df["netIncome"] / revenues * 100).where(revenues > 0, 0.0).round(2)
+
+    df["period"] = _period_ordinal(df["quarter"])
+    files = df["fileName"].fillna("")
+    known = df.assign(fileName=files).dropna(subset=["period"])
+    # Periods reported once per file; files never serve as each other's baseline
+    net_income_by_period = known.drop_duplicates(["fileName", "period"], keep=False).set_index(
+        ["fileName", "period"]
+    )["netIncome"]
+
+    def previous(offset):
+        keys = pd.MultiIndex.from_arrays([files, df["period"] - offset])
+        return pd.Series(net_income_by_period.reindex(keys).to_numpy(), index=df.index)
+
+    df["qoqGrowthPercent"] = _growth_percent(df["netIncome"], previous(1))
+    df["yoyGrowthPercent"] = _growth_percent(df["netIncome"], previous(4))
+    return df
+
+
+def _fmt(value, suffix=""):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return "n/a"
+    if isinstance(value, (bool, np.bool_)):
+        return "✅" if value else "❌"
+    return f"{value:,.2f}{suffix}" if isinstance(value, (int, float, np.number)) else str(value)
+
+
+def render_validation_table(metrics):
+    """Markdown table of the extracted statement rows and their validation status."""
+    header = "| File | Quarter | Revenue | Expenses | Net Income | Margin | QoQ | YoY | Submitted | Valid |"
+    lines = [header, "|" + "---|" * 10]
+    for row in metrics.itertuples(index=False):
+        valid = "n/a" if row.isValid is None or pd.isna(row.isValid) else _fmt(bool(row.isValid))
+        lines.append(
+            f"| {original_filename(row.fileName)} | {row.quarter} | {_fmt(row.revenues)} | {_fmt(row.expenses)} "
+            f"| {_fmt(row.netIncome)} | {_fmt(row.profitMarginPercent, '%')} "
+            f"| {_fmt(row.qoqGrowthPercent, '%')} | {_fmt(row.yoyGrowthPercent, '%')} "
+            f"| {_fmt(row.submittedNetIncome)} | {valid} |"
+        )
+    return "\n".join(lines)
+
+
+def _errors(results):
+    return [r for r in results if "error" in r]
+
+
+def build_digest(results):
+    """Compact, precomputed description of the batch for the LLM prompt."""
+    metrics = compute_metrics(results)
+    lines = [render_validation_table(metrics)]
+    mismatches = metrics[metrics["isValid"] == False]  # noqa: E712 (NaN/None rows are not mismatches)
+    if not mismatches.empty:
+        lines.append("Validation mismatches: " + "; ".join(
+            f"{original_filename(row.fileName)} {row.quarter}: submitted {_fmt(row.submittedNetIncome)} vs extracted {_fmt(row.netIncome)}"
+            for row in mismatches.itertuples(index=False)
+        ))
+    for error in _errors(results):
+        lines.append(f"Extraction failed for {original_filename(error.get('fileName'))}: {error['error']}")
+    return "\n".join(lines)
+
+
+def render_template_summary(results):
+    """Deterministic summary (no LLM): validation table, issues and growth trend."""
+    metrics = compute_metrics(results)
+    errors = _errors(results)
+    if metrics.empty:
+        lines = ["## Financial Summary", "", "No income statement data could be extracted."]
+        lines += [f"- {original_filename(e.get('fileName'))}: {e['error']}" for e in errors]
+        return "\n".join(lines)
+
+    checked = metrics[metrics["isValid"].notna()]
+    mismatches = checked[checked["isValid"] == False]  # noqa: E712
+    lines = ["## Financial Summary", "", render_validation_table(metrics), "", "### Validation"]
+    if checked.empty:
+        lines.append("- No submitted net income to validate against.")
+    elif mismatches.empty:
+        lines.append(f"- All {len(checked)} extracted statement(s) match the submitted net income.")
+    else:
+        lines.append(f"- {len(mismatches)} of {len(checked)} statement(s) do not match the submitted net income:")
+        lines += [
+            f"  - {original_filename(row.fileName)} ({row.quarter}): submitted {_fmt(row.submittedNetIncome)}, extracted {_fmt(row.netIncome)}"
+            for row in mismatches.itertuples(index=False)
+        ]
+    lines += [f"- Extraction failed for {original_filename(e.get('fileName'))}: {e['error']}" for e in errors]
+
+    latest = metrics.sort_values("period", na_position="first").iloc[-1]
+    lines += [
+        "",
+        "### Performance",
+        f"- Latest period {latest['quarter']}: net income {_fmt(latest['netIncome'])}, "
+        f"net profit margin {_fmt(latest['profitMarginPercent'], '%')}, "
+        f"QoQ {_fmt(latest['qoqGrowthPercent'], '%')}, YoY {_fmt(latest['yoyGrowthPercent'], '%')}.",
+    ]
+    return "\n".join(lines)
@@ -0,0 +1,207 @@
+import hashlib
+import re
+from functools import lru_cache
+
+import fitz  # PyMuPDF
+
+from app.config import OCR_MIN_IMAGE_COVERAGE, OCR_MIN_TEXT_CHARS
+
+# Plain extraction: ligatures expanded, whitespace normalised, no CID fallback work
+SCREENING_TEXT_FLAGS = fitz.TEXT_MEDIABOX_CLIP
+
+
+class PageScreener:
+    """Classifies pages into keyword groups (e.g. statement schemas) in a single pass.
+
+    ``groups`` is an ordered sequence of ``(name, keywords, min_hits)``; a page belongs
+    to the first group that sees ``min_hits`` distinct keywords. The keywords of all
+    groups are compiled into one case-insensitive pattern, so each page's text is
+    scanned once (and never lower-cased), and the scan stops as soon as any group is
+    satisfied. Pages without any fonts have no text layer and are skipped before
+    text extraction.
+    """
+
+    def __init__(self, groups):
+        self.groups = [(name, [k.lower() for k in keywords], min_hits) for name, keywords, min_hits in groups]
+        self._keyword_groups = {}
+        for index, (_, keywords, min_hits) in enumerate(self.groups):
+            if min_hits > len(set(keywords)):
+                continue  # can never match
+            for keyword in keywords:
+                self._keyword_groups.setdefault(keyword, []).append(index)
+        alternatives = "|".join(re.escape(k) for k in sorted(self._keyword_groups, key=len, reverse=True))
+        # Zero-width lookahead so overlapping keywords are still counted separately
+        self._pattern = re.compile(f"(?=({alternatives}))", re.IGNORECASE) if alternatives else None
+        self._min_chars = min((len(k) for k in self._keyword_groups), default=0)
+
+    def classify_text(self, text):
+        if self._pattern is None or len(text) < self._min_chars:
+            return None
+        seen = set()
+        hits = [0] * len(self.groups)
+        for match in self._pattern.finditer(text):
+            keyword = match.group(1).lower()
+            if keyword in seen:
+                continue
+            seen.add(keyword)
+            for index in self._keyword_groups[keyword]:
+                hits[index] += 1
+                if hits[index] >= self.groups[index][2]:
+                    return self.groups[index][0]
+        return None
+
+    def classify_page(self, page, text_chars=None):
+        if self._pattern is None:
+            return None
+        text = page.get_text(flags=SCREENING_TEXT_FLAGS) if page.get_fonts() else ""
+        if text_chars is not None:
+            text_chars[page.number] = len(text.strip())
+        return self.classify_text(text) if text else None
+
+    def screen(self, doc, page_hints=None, max_pages=None, text_chars=None):
+        """Return ``{page_index: group_name}`` for every matching page.
+
+        ``page_hints`` restricts screening to the given page indexes (e.g. pages known
+        from an earlier run); ``max_pages`` caps how many pages are scanned. A
+        ``text_chars`` dict is filled with each screened page's text length, so scan
+        classification can reuse it instead of extracting the text again.
+        """
+        if page_hints is None:
+            candidates = range(len(doc))
+        else:
+            candidates = sorted({p for p in page_hints if 0 <= p < len(doc)})
+        if max_pages:
+            candidates = list(candidates)[:max_pages]
+        matches = {}
+        for page_num in candidates:
+            group = self.classify_page(doc.load_page(page_num), text_chars)
+            if group is not None:
+                matches[page_num] = group
+        return matches
+
+
+@lru_cache(maxsize=32)
+def get_page_screener(groups):
+    """Compiled screeners are cached per ``((name, keywords, min_hits), ...)`` tuple."""
+    return PageScreener(groups)
+
+
+def _open(pdf):
+    return pdf if isinstance(pdf, fitz.Document) else fitz.open(pdf)
+
+
+def screen_pages(pdf, keywords, min_hits=3, page_hints=None, max_pages=None):
+    """Indexes of pages that mention at least ``min_hits`` of ``keywords``."""
+    doc = _open(pdf)
+    try:
+        screener = get_page_screener((("match", tuple(keywords), min_hits),))
+        return sorted(screener.screen(doc, page_hints, max_pages))
+    finally:
+        if doc is not pdf:
+            doc.close()
+
+
+def best_schema(matches, schemas):
+    """Pick the schema that matched the most pages (earlier schemas win ties)."""
+    if not matches:
+        return None, []
+    counts = {}
+    for name in matches.values():
+        counts[name] = counts.get(name, 0) + 1
+    order = [s.name for s in schemas]
+    best = max(counts, key=lambda name: (counts[name], -order.index(name)))
+    return best, sorted(page for page, name in matches.items() if name == best)
+
+
+def schema_screener(schemas):
+    return get_page_screener(tuple((s.name, tuple(s.keywords), s.min_hits) for s in schemas))
+
+
+def screen_schemas(pdf, schemas, page_hints=None, max_pages=None, text_chars=None):
+    """Detect the document's statement schema while screening its pages.
+
+    Returns ``(schema_name, pages)`` for the schema that matched the most pages
+    (earlier schemas win ties), or ``(None, [])`` if no page matched any schema.
+    """
+    doc = _open(pdf)
+    try:
+        matches = schema_screener(schemas).screen(doc, page_hints, max_pages, text_chars)
+    finally:
+        if doc is not pdf:
+            doc.close()
+    return best_schema(matches, schemas)
+
+
+def screen_schemas_in_texts(texts, schemas):
+    """Same as ``screen_schemas`` for already-extracted page texts (e.g. OCR output),
+    given as ``{page_index: text}``."""
+    screener = schema_screener(schemas)
+    matches = {}
+    for page_num, text in texts.items():
+        group = screener.classify_text(text)
+        if group is not None:
+            matches[page_num] = group
+    return best_schema(matches, schemas)
+
+
+def page_image_coverage(page):
+    """Fraction of the page area covered by images (summed over images, capped at 1)."""
+    area = page.rect.get_area()
+    if not area:
+        return 0.0
+    covered = sum(fitz.Rect(info["bbox"]).intersect(page.rect).get_area() for info in page.get_image_info())
+    return min(covered / area, 1.0)
+
+
+def page_text_chars(page):
+    return len(page.get_text(flags=SCREENING_TEXT_FLAGS).strip()) if page.get_fonts() else 0
+
+
+def classify_page_source(
+    page,
+    min_text_chars=OCR_MIN_TEXT_CHARS,
+    min_image_coverage=OCR_MIN_IMAGE_COVERAGE,
+    text_chars=None
+):
+    """``"scanned"`` for pages with (almost) no text layer that are mostly images, else ``"digital"``.
+
+    ``text_chars`` is the page's text length if screening already measured it.
+    """
+    if (text_chars if text_chars is not None else page_text_chars(page)) >= min_text_chars:
+        return "digital"
+    return "scanned" if page_image_coverage(page) >= min_image_coverage else "digital"
+
+
+def find_scanned_pages(pdf, max_pages=None, text_chars=None):
+    """Indexes of pages that need OCR, at most ``max_pages`` of them.
+
+    ``text_chars`` (``{page_index: length}`` from ``screen_schemas``) skips the text
+    extraction for pages that were already screened.
+    """
+    text_chars = text_chars or {}
+    doc = _open(pdf)
+    try:
+        scanned = []
+        for page_num in range(len(doc)):
+            page = doc.load_page(page_num)
+            if classify_page_source(page, text_chars=text_chars.get(page_num)) == "scanned":
+                scanned.append(page_num)
+                if max_pages and len(scanned) >= max_pages:
+                    break
+        return scanned
+    finally:
+        if doc is not pdf:
+            doc.close()
+
+
+def page_fingerprint(doc, page_index):
+    """SHA-256 of what a page draws: its content stream plus the raw streams of the
+    images and form XObjects it uses. Unchanged slides of a republished deck keep
+    their fingerprint even when other pages (or the file's metadata) change."""
+    page = doc.load_page(page_index)
+    digest = hashlib.sha256(page.read_contents())
+    digest.update(repr(tuple(page.rect)).encode("ascii"))
+    xrefs = {image[0] for image in page.get_images(full=True)} | {xobject[0] for xobject in page.get_xobjects()}
+    for xref in sorted(xrefs):
+        digest.update(doc.xref_stream_raw(xref) or b"")
+    return digest.hexdigest()
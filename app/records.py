@@ -0,0 +1,77 @@
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import pydantic_core
+from fastapi.responses import JSONResponse
+
+
+# Step 1: Slotted result records (no per-row __dict__); they read like the dicts they replace
+@dataclass(slots=True)
+class StatementRow:
+    """One parsed income statement row (latest period of one table)."""
+
+    quarter: str
+    revenues: float = 0.0
+    expenses: float = 0.0
+    netIncome: float = 0.0
+    grossProfit: float = 0.0
+    profitMarginPercent: float = 0.0
+    submittedNetIncome: Optional[float] = None
+    calculatedNetIncome: float = 0.0
+    isValid: Optional[bool] = None
+
+    # Mapping-style access, so code written against result dicts (``entry["netIncome"]``,
+    # ``entry.get("error")``, ``dict(entry)``) keeps working
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    # Slotted records cannot take ad-hoc keys: new per-row data needs a field declared here
+    def __setitem__(self, key, value):
+        if key not in self.__dataclass_fields__:
+            raise KeyError(f"{type(self).__name__} has no field {key!r}; declare it in app/records.py")
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.__dataclass_fields__
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.__dataclass_fields__ else default
+
+    def keys(self):
+        return self.__dataclass_fields__.keys()
+
+    def items(self):
+        return [(name, getattr(self, name)) for name in self.__dataclass_fields__]
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__dataclass_fields__}
+
+
+@dataclass(slots=True)
+class ValidationRow(StatementRow):
+    """A parsed row checked against the submitted net income, with per-file details."""
+
+    fileName: Optional[str] = None
+    filteredPDF: Optional[str] = None
+    pageCount: int = 0
+    schema: Optional[str] = None
+    extractionMethod: Optional[str] = None
+    processingTimeSeconds: float = 0.0
+    stageTimingsSeconds: Optional[Dict[str, float]] = None
+
+
+# Step 2: Fast JSON encoding of records, dicts and lists (pydantic-core, no jsonable_encoder pass)
+def to_json(content) -> bytes:
+    return pydantic_core.to_json(content)
+
+
+def dumps(content) -> str:
+    return to_json(content).decode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return to_json(content)
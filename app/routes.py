@@ -1,31 +1,31 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse
-from typing import List
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from typing import List, Optional
 import os
 import shutil
 from uuid import uuid4
 
-from app.agent import create_langgraph_agent
+from app.agent import agent_response, create_langgraph_agent
+from app.columnar import COLUMNAR_MEDIA_TYPES, columnar_chunks, resolve_export_path, write_columnar_file
+from app.document_store import DOCUMENT_ID_PATTERN, document_store
+from app.config import INVOICE_OCR_DPI, INVOICE_OCR_LANGUAGES
+from app.converter_pool import ocr_profile
+from app.invoices import validate_invoices
+from app.jobs import job_manager, JobQueueFullError
+from app.tools import iter_validated_pdfs, stream_summary, generate_summary, SUMMARY_MODES
+from app.manifest import parse_manifest
+from app.records import FastJSONResponse, dumps
+from app.tracing import recent_spans, render_prometheus
+from app.uploads import save_uploads, original_filename
+from app.workspace import create_workspace, release_workspace, request_workspace
 
 router = APIRouter()
 
-# Define directories
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-TEMP_FOLDER = os.path.join(BASE_DIR, "temp")  # app/temp/
-os.makedirs(TEMP_FOLDER, exist_ok=True)
-
 # LangGraph agent
 agent_executor = create_langgraph_agent()
 
 
-
-def cleanup_temp_folder():
-    """Delete the temp folder after processing."""
-    if os.path.exists(UPLOAD_FOLDER):
-        shutil.rmtree(UPLOAD_FOLDER)
-        print(f"\n✅ Cleaned temp folder: {UPLOAD_FOLDER}")
-
-
 # @router.post("/validate")
 # async def validate_pdfs(
 #     files: List[UploadFile] = File(...),
@@ -61,42 +61,409 @@ def cleanup_temp_folder():
 
 
 
+def check_summary_mode(summary: str):
+    if summary not in SUMMARY_MODES:
+        raise HTTPException(status_code=400, detail=f"summary must be one of: {', '.join(SUMMARY_MODES)}")
+    return summary
+
+
+def stored_document(document_id):
+    document_id = (document_id or "").strip().lower()
+    if not DOCUMENT_ID_PATTERN.match(document_id):
+        raise HTTPException(status_code=400, detail=f"Invalid document ID: {document_id}")
+    metadata = document_store.get(document_id)
+    if metadata is None:
+        raise HTTPException(status_code=404, detail=f"Document {document_id} not found.")
+    return metadata
+
+
+def stored_document_request(metadata, submittedNetIncome):
+    """Validation request for a stored document: no upload, no rehash, only its known pages screened."""
+    document_id = metadata["documentId"]
+    return {
+        "fileName": metadata["fileName"],
+        "filePath": document_store.pdf_path(document_id),
+        "contentHash": document_id,
+        "documentId": document_id,
+        "pageHints": document_store.page_hints(metadata),
+        "submittedNetIncome": submittedNetIncome
+    }
+
+
+async def build_validation_requests(
+    files: List[UploadFile],
+    submittedNetIncome: float,
+    workspace: str,
+    document_ids: List[str] = None
+):
+    """Stream uploaded PDFs into the request's workspace and build the agent's validation requests.
+
+    Stored documents referenced by ``document_ids`` are validated in place.
+    """
+    document_ids = list(dict.fromkeys(document_ids or []))
+    if not files and not document_ids:
+        raise HTTPException(status_code=400, detail="No files uploaded and no documentIds given.")
+
+    stored = [stored_document(document_id) for document_id in document_ids]
+    uploads = await save_uploads(files, workspace) if files else []
+
+    return [
+        {
+            "fileName": upload["fileName"],
+            "filePath": upload["filePath"],
+            "contentHash": upload["contentHash"],
+            "submittedNetIncome": submittedNetIncome
+        }
+        for upload in uploads
+    ] + [stored_document_request(metadata, submittedNetIncome) for metadata in stored]
+
+
 @router.post("/validate")
 async def validate_pdfs(
+    files: List[UploadFile] = File([]),
+    submittedNetIncome: float = Form(...),
+    summary: str = Form("llm"),
+    documentIds: List[str] = Form([])
+):
+    check_summary_mode(summary)
+    # Each request gets its own workspace, released when the request ends
+    with request_workspace() as workspace:
+        validation_requests = await build_validation_requests(files, submittedNetIncome, workspace, documentIds)
+
+        try:
+            # Run LangGraph agent off the event loop so other clients stay responsive
+            result = await run_in_threadpool(agent_executor.invoke, {
+                "input": "Validate uploaded PDFs.",
+                "validation_requests": validation_requests,
+                "results": [],
+                "summary_mode": summary
+            })
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Agent failed: {str(e)}")
+
+    return FastJSONResponse(content=agent_response(result))
+
+
+def sse_event(event, payload):
+    return f"event: {event}\ndata: {dumps(payload)}\n\n"
+
+
+def validation_events(validation_requests, workspace, summary_mode="llm"):
+    """Server-sent events: one `file` event per finished file, then `summary` chunks, then `done`.
+
+    A plain generator: Starlette iterates it in the threadpool, so the blocking
+    extraction and LLM calls never run on the event loop.
+    """
+    try:
+        # Files finish in any order; the upload position identifies them even when names repeat
+        indexed_requests = [dict(req, index=i) for i, req in enumerate(validation_requests)]
+        results = []
+        for req, file_results in iter_validated_pdfs(indexed_requests):
+            results.extend(file_results)
+            yield sse_event("file", {
+                "index": req["index"],
+                "fileName": req["fileName"],
+                "results": file_results
+            })
+
+        try:
+            for text in stream_summary(results, summary_mode):
+                yield sse_event("summary", {"text": text})
+        except Exception as e:
+            yield sse_event("error", {"detail": f"Summary generation failed: {str(e)}"})
+
+        yield sse_event("done", {"results": results})
+    finally:
+        release_workspace(workspace)
+
+
+@router.post("/validate/stream")
+async def validate_pdfs_stream(
+    files: List[UploadFile] = File([]),
+    submittedNetIncome: float = Form(...),
+    summary: str = Form("llm"),
+    documentIds: List[str] = Form([])
+):
+    check_summary_mode(summary)
+    workspace = create_workspace()
+    try:
+        validation_requests = await build_validation_requests(files, submittedNetIncome, workspace, documentIds)
+    except BaseException:
+        release_workspace(workspace)
+        raise
+
+    # The workspace is released by the event generator once streaming ends
+    return StreamingResponse(
+        validation_events(validation_requests, workspace, summary),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/validate/invoices")
+async def validate_invoice_pdfs(
     files: List[UploadFile] = File(...),
-    submittedNetIncome: float = Form(...)
+    submittedAmount: List[float] = Form(...),
+    ocrDpi: int = Form(INVOICE_OCR_DPI),
+    ocrLanguages: str = Form(",".join(INVOICE_OCR_LANGUAGES))
 ):
+    """Validate invoice totals; one submitted amount for all files, or one per file in upload order.
+
+    ``ocrDpi`` / ``ocrLanguages`` only apply to scanned invoices.
+    """
     if not files:
         raise HTTPException(status_code=400, detail="No files uploaded.")
+    if len(submittedAmount) not in (1, len(files)):
+        raise HTTPException(status_code=400, detail="Provide one submittedAmount, or one per uploaded file.")
+    if not 72 <= ocrDpi <= 600:
+        raise HTTPException(status_code=400, detail="ocrDpi must be between 72 and 600.")
+    try:
+        # Each OCR profile loads its own converters: only a few profiles are reachable
+        ocrDpi, languages = ocr_profile(ocrDpi, [lang.strip() for lang in ocrLanguages.split(",") if lang.strip()])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    amounts = submittedAmount * len(files) if len(submittedAmount) == 1 else submittedAmount
 
-    validation_requests = []
+    with request_workspace() as workspace:
+        uploads = await save_uploads(files, workspace)
+        invoice_requests = [
+            {"fileName": upload["fileName"], "filePath": upload["filePath"], "submittedAmount": amount}
+            for upload, amount in zip(uploads, amounts)
+        ]
+        # Text-layer extraction takes milliseconds; only low-confidence invoices reach docling
+        results = await run_in_threadpool(validate_invoices, invoice_requests, ocrDpi, languages)
 
-    for file in files:
-        # Generate unique filename
-        unique_filename = f"{uuid4().hex}_{file.filename}"
-        save_path = os.path.join(TEMP_FOLDER, unique_filename)
+    return FastJSONResponse(content={"results": results})
 
-        # ✅ Ensure temp directory exists before saving
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
 
-        # Save file to temp directory
-        with open(save_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+BULK_FORMATS = ("json", "ndjson", "arrow", "parquet")
 
-        # Add validation request entry
-        validation_requests.append({
-            "fileName": unique_filename,
-            "submittedNetIncome": submittedNetIncome
-        })
 
+async def build_bulk_requests(manifest: UploadFile, files: List[UploadFile], workspace: str):
+    """Match manifest entries to uploaded files (by original name) or stored document hashes.
+
+    Returns ``(validation_requests, missing)``; ``missing`` holds error entries for
+    manifest rows whose file was not uploaded. Both carry the manifest ``index``.
+    """
     try:
-        # Run LangGraph agent
-        result = agent_executor.invoke({
-            "input": "Validate uploaded PDFs.",
-            "validation_requests": validation_requests,
-            "results": []
-        })
+        entries = parse_manifest(await manifest.read(), manifest.filename or "")
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid manifest: {str(e)}")
+
+    uploads = await save_uploads(files, workspace) if files else []
+    # Uploads sharing a name are matched to manifest entries in upload order
+    uploads_by_name = {}
+    for upload in uploads:
+        uploads_by_name.setdefault(original_filename(upload["fileName"]), []).append(upload)
+
+    validation_requests, missing = [], []
+    for index, entry in enumerate(entries):
+        if entry["fileName"]:
+            candidates = uploads_by_name.get(os.path.basename(entry["fileName"]))
+            upload = None
+            if candidates:
+                # The last upload of a name stays available: several entries may check one file
+                upload = candidates.pop(0) if len(candidates) > 1 else candidates[0]
+            if upload is None:
+                missing.append({"index": index, "fileName": entry["fileName"], "results": [
+                    {"fileName": entry["fileName"], "error": "File listed in the manifest was not uploaded."}
+                ]})
+                continue
+            validation_requests.append({
+                "index": index,
+                "fileName": upload["fileName"],
+                "filePath": upload["filePath"],
+                "contentHash": upload["contentHash"],
+                "submittedNetIncome": entry["submittedNetIncome"]
+            })
+        else:
+            metadata = document_store.get(entry["contentHash"])
+            if metadata is not None:
+                # Stored document: validated from the store, even if its extraction was evicted
+                validation_requests.append(
+                    {"index": index, **stored_document_request(metadata, entry["submittedNetIncome"])}
+                )
+                continue
+            validation_requests.append({
+                "index": index,
+                "fileName": entry["contentHash"],
+                "contentHash": entry["contentHash"],
+                "submittedNetIncome": entry["submittedNetIncome"]
+            })
+    return validation_requests, missing
+
+
+def iter_bulk_results(validation_requests, missing):
+    yield from missing
+    for req, file_results in iter_validated_pdfs(validation_requests):
+        yield {"index": req["index"], "fileName": req["fileName"], "results": file_results}
+
+
+def bulk_summary(results, summary_mode):
+    try:
+        return generate_summary(results, summary_mode, priority="bulk")
+    except Exception as e:
+        return f" Summary generation failed: {str(e)}"
+
+
+def run_bulk_validation(validation_requests, missing, summary_mode):
+    entries = sorted(iter_bulk_results(validation_requests, missing), key=lambda e: e["index"])
+    results = [result for entry in entries for result in entry["results"]]
+    return {"results": results, "summary": bulk_summary(results, summary_mode)}
+
+
+def bulk_ndjson_lines(validation_requests, missing, summary_mode, workspace):
+    """One JSON line per manifest entry as it finishes, then a final summary line."""
+    try:
+        results = []
+        for entry in iter_bulk_results(validation_requests, missing):
+            results.extend(entry["results"])
+            yield dumps({"type": "file", **entry}) + "\n"
+        summary = bulk_summary(results, summary_mode)
+        yield dumps({"type": "summary", "summary": summary}) + "\n"
+    finally:
+        release_workspace(workspace)
+
+
+def bulk_columnar_chunks(validation_requests, missing, format, workspace):
+    """Arrow IPC stream / Parquet bytes, written as manifest entries finish."""
+    try:
+        yield from columnar_chunks(iter_bulk_results(validation_requests, missing), format)
+    finally:
+        release_workspace(workspace)
+
+
+def export_bulk_results(validation_requests, missing, format, export_path):
+    row_count = write_columnar_file(iter_bulk_results(validation_requests, missing), format, export_path)
+    return {"format": format, "exportPath": export_path, "rows": row_count}
+
+
+@router.post("/validate/bulk")
+async def validate_bulk(
+    manifest: UploadFile = File(...),
+    files: List[UploadFile] = File([]),
+    format: str = Form("json"),
+    summary: str = Form("none"),
+    exportPath: Optional[str] = Form(None)
+):
+    """Validate many filings in one request, each against its own submitted net income."""
+    check_summary_mode(summary)
+    if format not in BULK_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(BULK_FORMATS)}")
+    columnar = format in COLUMNAR_MEDIA_TYPES
+    if columnar and summary != "none":
+        raise HTTPException(status_code=400, detail=f"summary is not available with format={format}")
+    if exportPath and not columnar:
+        raise HTTPException(status_code=400, detail="exportPath requires format=arrow or format=parquet")
+    export_path = None
+    if exportPath:
+        try:
+            export_path = resolve_export_path(exportPath, format)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    workspace = create_workspace()
+    try:
+        validation_requests, missing = await build_bulk_requests(manifest, files, workspace)
+    except BaseException:
+        release_workspace(workspace)
+        raise
+
+    if format == "ndjson":
+        # The workspace is released by the line generator once streaming ends
+        return StreamingResponse(
+            bulk_ndjson_lines(validation_requests, missing, summary, workspace),
+            media_type="application/x-ndjson"
+        )
+    if columnar and export_path is None:
+        return StreamingResponse(
+            bulk_columnar_chunks(validation_requests, missing, format, workspace),
+            media_type=COLUMNAR_MEDIA_TYPES[format]
+        )
+
+    try:
+        if export_path is not None:
+            result = await run_in_threadpool(export_bulk_results, validation_requests, missing, format, export_path)
+        else:
+            result = await run_in_threadpool(run_bulk_validation, validation_requests, missing, summary)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Agent failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Bulk validation failed: {str(e)}")
+    finally:
+        release_workspace(workspace)
+
+    return FastJSONResponse(content=result)
+
+
+def store_uploads(uploads):
+    return [document_store.add(upload["filePath"], upload["contentHash"], upload["fileName"]) for upload in uploads]
+
+
+@router.post("/documents", status_code=201)
+async def create_documents(files: List[UploadFile] = File(...)):
+    """Store PDFs for later validation by ID (the SHA-256 of their bytes)."""
+    if not files:
+        raise HTTPException(status_code=400, detail="No files uploaded.")
+    with request_workspace() as workspace:
+        uploads = await save_uploads(files, workspace)
+        # Uploads are moved into the store and screened once
+        documents = await run_in_threadpool(store_uploads, uploads)
+    return FastJSONResponse(status_code=201, content={"documents": documents})
+
+
+@router.get("/documents/{document_id}")
+async def get_document(document_id: str):
+    return FastJSONResponse(content=stored_document(document_id))
+
+
+@router.delete("/documents/{document_id}", status_code=204)
+async def delete_document(document_id: str):
+    stored_document(document_id)
+    document_store.delete(document_id.strip().lower())
+    return Response(status_code=204)
+
+
+@router.post("/jobs", status_code=202)
+async def create_validation_job(
+    files: List[UploadFile] = File([]),
+    submittedNetIncome: float = Form(...),
+    summary: str = Form("llm"),
+    documentIds: List[str] = Form([])
+):
+    check_summary_mode(summary)
+    # Refuse before ingesting anything when the queue is already full
+    if not job_manager.has_capacity():
+        raise HTTPException(status_code=429, detail="Job queue is full.", headers={"Retry-After": "5"})
+
+    # The workspace outlives this request and is released when the job finishes
+    workspace = create_workspace()
+    try:
+        validation_requests = await build_validation_requests(files, submittedNetIncome, workspace, documentIds)
+        job = job_manager.submit(validation_requests, summary, on_finish=lambda: release_workspace(workspace))
+    except JobQueueFullError as e:
+        release_workspace(workspace)
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    except BaseException:
+        release_workspace(workspace)
+        raise
+
+    return FastJSONResponse(status_code=202, content=job, headers={"Location": f"/jobs/{job['jobId']}"})
+
+
+@router.get("/jobs/{job_id}")
+async def get_validation_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return FastJSONResponse(content=job)
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """Prometheus text exposition of the per-stage duration histograms."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
 
-    return JSONResponse(content=result)
+@router.get("/traces")
+async def get_traces(limit: int = 200, traceId: Optional[str] = None):
+    """Most recent finished spans of this process, newest last."""
+    return FastJSONResponse(content={"spans": recent_spans(max(1, min(limit, 2000)), traceId)})
@@ -0,0 +1,144 @@
+import hashlib
+import json
+
+from app.config import STATEMENT_SCHEMAS_FILE, ENABLED_SCHEMAS
+from app.table_parser import LabelDictionary
+
+# Row fields a label rule may fill (the others are derived from them)
+STATEMENT_FIELDS = ("revenues", "expenses", "netIncome")
+
+
+class StatementSchema:
+    """A kind of financial document: how to recognise its pages and read its rows.
+
+    ``keywords`` / ``min_hits`` drive page screening; ``labels`` maps table rows to
+    entry fields (``None`` for documents with their own pipeline, such as invoices).
+    """
+
+    def __init__(self, name, title, kind, keywords, min_hits, label_rules=None):
+        self.name = name
+        self.title = title
+        self.kind = kind
+        self.keywords = list(keywords)
+        self.min_hits = min_hits
+        self.label_rules = label_rules or []
+        self.labels = LabelDictionary(self.label_rules) if self.label_rules else None
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "title": self.title,
+            "kind": self.kind,
+            "keywords": self.keywords,
+            "minHits": self.min_hits,
+            "labels": [
+                {"field": field, "synonyms": synonyms, "exclude": exclusions}
+                for field, synonyms, exclusions in self.label_rules
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        for rule in data.get("labels", []):
+            if rule["field"] not in STATEMENT_FIELDS:
+                raise ValueError(f"Schema {data['name']!r}: unknown label field {rule['field']!r}")
+        return cls(
+            name=data["name"],
+            title=data.get("title", data["name"]),
+            kind=data.get("kind", "income_statement"),
+            keywords=data["keywords"],
+            min_hits=int(data.get("minHits", len(data["keywords"]))),
+            label_rules=[
+                (rule["field"], rule["synonyms"], rule.get("exclude", []))
+                for rule in data.get("labels", [])
+            ]
+        )
+
+
+IND_AS = StatementSchema(
+    "ind_as", "Ind-AS statement of profit and loss", "income_statement",
+    keywords=["profit after tax", "total income", "total expenses"],
+    min_hits=3,
+    label_rules=[
+        ("revenues", ["total income"], ["operations"]),
+        ("expenses", ["total expenses"], []),
+        ("netIncome", ["profit after tax"], ["margin"]),
+    ]
+)
+
+US_GAAP = StatementSchema(
+    "us_gaap", "US GAAP consolidated statement of income", "income_statement",
+    keywords=[
+        "consolidated statements of income", "statements of operations", "net operating revenues",
+        "total revenues", "gross profit", "operating income", "income before income taxes", "net income",
+    ],
+    min_hits=4,
+    label_rules=[
+        ("revenues", ["net operating revenues", "total revenues", "net revenues", "net sales"], ["cost of"]),
+        ("expenses", ["total costs and expenses", "total operating expenses", "total expenses"], []),
+        ("netIncome", ["net income"], ["noncontrolling", "non-controlling", "per share", "margin"]),
+    ]
+)
+
+IFRS = StatementSchema(
+    "ifrs", "IFRS statement of profit or loss", "income_statement",
+    keywords=[
+        "statement of profit or loss", "revenue", "profit before tax", "profit for the year",
+        "profit for the period", "total comprehensive income",
+    ],
+    min_hits=3,
+    label_rules=[
+        ("revenues", ["total revenue", "revenue"], ["cost of", "deferred"]),
+        ("expenses", ["total expenses", "total operating expenses"], []),
+        ("netIncome", ["profit for the year", "profit for the period"], ["non-controlling", "per share", "margin"]),
+    ]
+)
+
+INVOICE = StatementSchema(
+    "invoice", "Invoice", "invoice",
+    keywords=[
+        "tax invoice", "invoice number", "invoice no", "taxable amount", "tax amount",
+        "total amount", "grand total", "amount due", "gstin", "bill to",
+    ],
+    min_hits=3
+)
+
+# Screening order matters only for ties: earlier schemas win
+SCHEMA_REGISTRY = {schema.name: schema for schema in [IND_AS, US_GAAP, IFRS, INVOICE]}
+
+
+def register_schema(schema):
+    """Add or replace a schema in the registry."""
+    SCHEMA_REGISTRY[schema.name] = schema
+    return schema
+
+
+def load_schemas_file(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for data in json.load(f):
+            register_schema(StatementSchema.from_dict(data))
+
+
+def get_schema(name):
+    """The registered schema called ``name``, or None (e.g. a schema removed since a result was cached)."""
+    return SCHEMA_REGISTRY.get(name)
+
+
+def enabled_schemas():
+    if not ENABLED_SCHEMAS:
+        return list(SCHEMA_REGISTRY.values())
+    return [SCHEMA_REGISTRY[name] for name in ENABLED_SCHEMAS if name in SCHEMA_REGISTRY]
+
+
+def registry_fingerprint():
+    """Changes whenever enabled schemas, keywords or label rules change (for cache keys)."""
+    payload = json.dumps([schema.to_dict() for schema in enabled_schemas()], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+if STATEMENT_SCHEMAS_FILE:
+    load_schemas_file(STATEMENT_SCHEMAS_FILE)
+
+_unknown_schemas = [name for name in ENABLED_SCHEMAS if name not in SCHEMA_REGISTRY]
+if _unknown_schemas:
+    print(f"⚠️ ENABLED_SCHEMAS lists unknown schemas, ignored: {', '.join(_unknown_schemas)}")
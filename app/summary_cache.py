@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from app.config import (
+    SUMMARY_CACHE_BACKEND,
+    SUMMARY_CACHE_PATH,
+    SUMMARY_CACHE_TTL,
+    SUMMARY_CACHE_MAX_ENTRIES,
+    SUMMARY_CACHE_MAX_BYTES,
+)
+from app.disk_cache import DiskLRUCache
+from app.uploads import UPLOAD_PREFIX
+
+# Fields that differ between otherwise identical runs of the same document. ``fileName`` is
+# kept (minus the upload prefix): summaries quote file names
+IGNORED_FIELDS = {"filteredPDF", "processingTimeSeconds", "stageTimingsSeconds"}
+
+
+def canonicalize_results(results):
+    """Drop per-run fields and upload uuid prefixes so identical data yields identical keys."""
+    canonical = []
+    for entry in results:
+        item = {}
+        for key, value in entry.items():
+            if key in IGNORED_FIELDS:
+                continue
+            item[key] = UPLOAD_PREFIX.sub("", value) if isinstance(value, str) else value
+        canonical.append(item)
+    return canonical
+
+
+def summary_cache_key(results, model, prompt_version):
+    payload = json.dumps(
+        {"model": model, "promptVersion": prompt_version, "results": canonicalize_results(results)},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SQLiteSummaryCache:
+    """Summary cache in a single SQLite file with TTL expiry and LRU eviction."""
+
+    def __init__(self, path, ttl=SUMMARY_CACHE_TTL, max_entries=SUMMARY_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS summaries ("
+                "key TEXT PRIMARY KEY, summary TEXT NOT NULL, created_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        """One transaction (committed, or rolled back on error) on a connection closed afterwards."""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT summary FROM summaries WHERE key = ? AND created_at >= ?", (key, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE summaries SET last_used = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def set(self, key, summary):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO summaries (key, summary, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, summary, now, now)
+            )
+            conn.execute("DELETE FROM summaries WHERE created_at < ?", (now - self.ttl,))
+            conn.execute(
+                "DELETE FROM summaries WHERE key NOT IN "
+                "(SELECT key FROM summaries ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+
+
+class DiskSummaryCache:
+    """Summary cache stored as JSON files via DiskLRUCache, with TTL checked on read."""
+
+    def __init__(self, directory, ttl=SUMMARY_CACHE_TTL, max_entries=SUMMARY_CACHE_MAX_ENTRIES,
+                 max_bytes=SUMMARY_CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self._cache = DiskLRUCache(directory, max_bytes=max_bytes, max_entries=max_entries)
+
+    def get(self, key):
+        value = self._cache.get(key)
+        if value is None:
+            return None
+        if time.time() - value["createdAt"] > self.ttl:
+            self._cache.delete(key)
+            return None
+        return value["summary"]
+
+    def set(self, key, summary):
+        self._cache.set(key, {"summary": summary, "createdAt": time.time()})
+
+
+def create_summary_cache(backend=SUMMARY_CACHE_BACKEND, path=SUMMARY_CACHE_PATH):
+    if backend == "sqlite":
+        return SQLiteSummaryCache(os.path.join(path, "summaries.sqlite3"))
+    if backend == "disk":
+        return DiskSummaryCache(path)
+    if backend == "none":
+        return None
+    raise ValueError(f"Unknown SUMMARY_CACHE_BACKEND: {backend}")
@@ -0,0 +1,123 @@
+import re
+
+# "1,234.5", "$ 1,234", "₹1,234", "(1,234)", "-1,234", "1,234 Cr", "12.5%", "1.2 bn"
+NUMBER_PATTERN = re.compile(
+    r"""^\s*
+    (?P<open>\()?\s*
+    (?P<sign>[-+–−])?\s*
+    (?:Rs\.?|INR|USD|[$₹€£])?\s*
+    (?P<digits>\d[\d,]*(?:\.\d+)?|\.\d+)\s*
+    (?P<unit>crores?|cr\.?|lakhs?|mn|million|bn|billion|thousand|k|m|b|%)?\s*
+    (?P<close>\))?\s*$""",
+    re.IGNORECASE | re.VERBOSE
+)
+
+# Latest-quarter column headers such as "Q3 FY25" or "FY25Q3"
+PERIOD_HEADER_PATTERN = re.compile(r"Q\d\s*FY\d+|FY\d+Q\d", re.IGNORECASE)
+
+
+def parse_number(cell):
+    """Parse a statement cell; parenthesised amounts are negative, unit suffixes are dropped.
+
+    Returns None for anything that is not a number (labels, "-", "n.m.").
+    """
+    match = NUMBER_PATTERN.match(cell)
+    if match is None:
+        return None
+    value = float(match.group("digits").replace(",", ""))
+    if match.group("open") and match.group("close"):
+        value = -value
+    elif match.group("open") or match.group("close"):
+        return None
+    if match.group("sign") and match.group("sign") != "+":
+        value = -value
+    return value
+
+
+def split_cells(line):
+    """Non-empty, stripped cells of a markdown table row."""
+    return [cell.strip() for cell in line.split("|") if cell.strip()]
+
+
+class MarkdownTable:
+    """A markdown table tokenized once: raw row text, cells and pre-parsed numeric values."""
+
+    __slots__ = ("lines", "cells", "values")
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.cells = [split_cells(line) for line in lines]
+        self.values = [[parse_number(cell) for cell in row] for row in self.cells]
+
+    @property
+    def headers(self):
+        return self.cells[0] if self.cells else []
+
+    def number(self, row_index, column_index):
+        row = self.values[row_index]
+        if column_index < len(row) and row[column_index] is not None:
+            return row[column_index]
+        return 0.0
+
+    def latest_period_column(self):
+        return next((i for i, h in enumerate(self.headers) if PERIOD_HEADER_PATTERN.match(h)), 1)
+
+
+class LabelDictionary:
+    """Precompiled row-label rules mapping statement rows to entry fields.
+
+    ``rules`` is an ordered list of ``(field, synonyms, exclusions)``. A row belongs to
+    the first rule whose synonym occurs in the row text and none of whose exclusions
+    do. All synonyms are matched with one compiled pattern per row.
+    """
+
+    def __init__(self, rules):
+        self.rules = [(field, [s.lower() for s in synonyms], [e.lower() for e in exclusions])
+                      for field, synonyms, exclusions in rules]
+        self._synonym_rule = {}
+        for index, (_, synonyms, _) in enumerate(self.rules):
+            for synonym in synonyms:
+                self._synonym_rule.setdefault(synonym, set()).add(index)
+        alternatives = "|".join(re.escape(s) for s in sorted(self._synonym_rule, key=len, reverse=True))
+        self._synonyms = re.compile(f"(?=({alternatives}))", re.IGNORECASE) if alternatives else None
+        self._exclusions = [
+            re.compile("|".join(re.escape(e) for e in exclusions), re.IGNORECASE) if exclusions else None
+            for _, _, exclusions in self.rules
+        ]
+
+    @property
+    def keywords(self):
+        return list(self._synonym_rule)
+
+    def mentions_any(self, text):
+        return self._synonyms is not None and self._synonyms.search(text) is not None
+
+    def classify(self, text):
+        """Field name for a row of text, or None."""
+        if self._synonyms is None:
+            return None
+        candidates = set()
+        for match in self._synonyms.finditer(text):
+            candidates |= self._synonym_rule[match.group(1).lower()]
+        for index in sorted(candidates):
+            exclusion = self._exclusions[index]
+            if exclusion is None or exclusion.search(text) is None:
+                return self.rules[index][0]
+        return None
+
+
+def extract_markdown_tables(markdown_text, labels):
+    """Single pass over the markdown: tables (blocks of |-rows) that mention any label."""
+    tables, current, relevant = [], [], False
+    for line in markdown_text.splitlines():
+        line = line.strip()
+        if line.startswith("|") and line.endswith("|"):
+            current.append(line)
+            relevant = relevant or labels.mentions_any(line)
+        elif current and not line:
+            if relevant:
+                tables.append(MarkdownTable(current))
+            current, relevant = [], False
+    if current and relevant:
+        tables.append(MarkdownTable(current))
+    return tables
@@ -1,199 +1,756 @@
 import os
 import time
-import re
-import shutil
+import hashlib
+import itertools
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, FIRST_EXCEPTION, CancelledError, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 import fitz  # PyMuPDF
-from PyPDF2 import PdfReader, PdfWriter
-from docling.document_converter import DocumentConverter
+from io import BytesIO
+from docling.datamodel.base_models import DocumentStream
 from langchain_core.tools import tool
-from typing import List, Dict, Any
-from langchain_ollama import ChatOllama
+from typing import List, Dict, Any, Optional
 from langchain.prompts import PromptTemplate, ChatPromptTemplate
 from langchain_core.messages import AIMessage
 from langchain_core.messages import HumanMessage
+from app.converter_pool import get_converter_pool, in_worker_process, init_worker_converter_pool
+from app.disk_cache import DiskLRUCache
+from app.llm_scheduler import get_summary_scheduler
+from app.metrics import build_digest, render_template_summary
+from app.summary_cache import create_summary_cache, summary_cache_key
+from app.records import StatementRow, ValidationRow
+from app.page_screening import find_scanned_pages, page_fingerprint, screen_pages, screen_schemas, screen_schemas_in_texts
+from app.table_parser import MarkdownTable, extract_markdown_tables, parse_number, split_cells
+from app.schemas import IND_AS, enabled_schemas, get_schema, registry_fingerprint
+from app.tracing import (
+    collect_stage_observations,
+    collect_stage_timings,
+    current_traceparent,
+    record_stage,
+    replay_stage_observations,
+    span,
+)
+from app.config import (
+    EXTRACTION_CACHE_ENABLED,
+    EXTRACTION_CACHE_DIR,
+    EXTRACTION_CACHE_MAX_BYTES,
+    EXTRACTION_CACHE_MAX_ENTRIES,
+    PAGE_CACHE_ENABLED,
+    PAGE_CACHE_DIR,
+    PAGE_CACHE_MAX_BYTES,
+    PAGE_CACHE_MAX_ENTRIES,
+    VALIDATION_WORKERS,
+    VALIDATION_FILE_TIMEOUT,
+    PAGE_CONVERSION_WORKERS,
+    PAGE_SHARD_SIZE,
+    SCREENING_MAX_PAGES,
+    OCR_MAX_PAGES,
+    OCR_DPI,
+    OCR_LANGUAGES,
+    OLLAMA_MODEL,
+)
 
 # Setup folders
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 pdf_folder_path = os.path.join(BASE_DIR, "temp")  # ✅ Not income_statements
-# Cleanup temp folder
-def cleanup_temp_folder():
-    temp_folder_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "temp")
-    if os.path.exists(temp_folder_path):
-        shutil.rmtree(temp_folder_path)
-        print(f"\n✅ Cleaned temp folder: {temp_folder_path}")
 
+# Ind-AS is the default schema of the single-schema helpers below
+INCOME_STATEMENT_KEYWORDS = IND_AS.keywords
+INCOME_STATEMENT_LABELS = IND_AS.labels
 
-# Step 1: Find income statement pages
-def find_income_statement_pages(pdf_path, keywords=None):
+# Bump whenever page detection or table parsing changes so stale cache entries are ignored
+PARSER_VERSION = "6"
+
+extraction_cache = DiskLRUCache(
+    EXTRACTION_CACHE_DIR,
+    max_bytes=EXTRACTION_CACHE_MAX_BYTES,
+    max_entries=EXTRACTION_CACHE_MAX_ENTRIES
+) if EXTRACTION_CACHE_ENABLED else None
+
+# Docling markdown per page, keyed by page fingerprint: revised decks only re-convert changed pages
+page_cache = DiskLRUCache(
+    PAGE_CACHE_DIR,
+    max_bytes=PAGE_CACHE_MAX_BYTES,
+    max_entries=PAGE_CACHE_MAX_ENTRIES
+) if PAGE_CACHE_ENABLED else None
+
+
+# Step 1: Find income statement pages (accepts a path or an already-open fitz document)
+def find_income_statement_pages(pdf_path, keywords=None, page_hints=None, max_pages=None):
     if keywords is None:
-        keywords = ["profit after tax", "total income", "total expenses"]
-    doc = fitz.open(pdf_path)
-    matched_pages = []
-    for page_num in range(len(doc)):
-        text = doc.load_page(page_num).get_text().lower()
-        hits = sum(1 for keyword in keywords if keyword in text)
-        if hits >= 3:
-            matched_pages.append(page_num)
-    return matched_pages
-
-# Step 2: Extract filtered PDF with only income statement pages
-def extract_pages_to_temp_pdf(input_pdf, selected_pages):
-    from PyPDF2 import PdfReader, PdfWriter
-    import os
-
-    temp_folder_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "temp")
-
-    reader = PdfReader(input_pdf)
-    writer = PdfWriter()
-    for page_index in selected_pages:
-        writer.add_page(reader.pages[page_index])
-    base = os.path.splitext(os.path.basename(input_pdf))[0]
-    temp_pdf_path = os.path.join(temp_folder_path, f"{base}_filtered_income.pdf")
-    with open(temp_pdf_path, "wb") as f:
-        writer.write(f)
-    return temp_pdf_path
+        keywords = INCOME_STATEMENT_KEYWORDS
+    return screen_pages(
+        pdf_path,
+        keywords,
+        min_hits=3,
+        page_hints=page_hints,
+        max_pages=max_pages or SCREENING_MAX_PAGES
+    )
+
+# Step 2: Copy only the income statement pages into an in-memory PDF for docling
+def extract_pages_to_pdf_bytes(doc, selected_pages):
+    with span("pdf_rewrite", pages=len(selected_pages)) as rewrite:
+        subset = fitz.open()
+        try:
+            for page_index in selected_pages:
+                subset.insert_pdf(doc, from_page=page_index, to_page=page_index)
+            pdf_bytes = subset.tobytes()
+        finally:
+            subset.close()
+        rewrite.set_attribute("bytes", len(pdf_bytes))
+    return pdf_bytes
+
+
+def extract_pages_to_pdf_stream(doc, selected_pages, name):
+    return DocumentStream(name=name, stream=BytesIO(extract_pages_to_pdf_bytes(doc, selected_pages)))
+
 
+# Step 1b: Detect the statement schema (Ind-AS, US GAAP, IFRS, invoice) while screening pages
+def detect_statement_pages(pdf_path, page_hints=None, max_pages=None, text_chars=None):
+    return screen_schemas(
+        pdf_path,
+        enabled_schemas(),
+        page_hints=page_hints,
+        max_pages=max_pages or SCREENING_MAX_PAGES,
+        text_chars=text_chars
+    )
 
 # Step 3: Extract numbers from columns
 def extract_number_from_column(line, column_index):
-    try:
-        parts = [cell.strip() for cell in line.split("|") if cell.strip()]
-        return float(parts[column_index].replace("$", "").replace(",", ""))
-    except (IndexError, ValueError):
-        return 0.0
-
-# Step 4: Extract relevant tables
-def extract_income_tables_from_markdown(markdown_text):
-    tables, current, inside = [], [], False
-    for line in markdown_text.splitlines():
-        line = line.strip()
-        if line.startswith("|") and line.endswith("|"):
-            inside = True
-            current.append(line)
-        elif inside and not line:
-            inside = False
-            joined = " ".join(current).lower()
-            if any(k in joined for k in ["profit after tax", "total income", "total expenses"]):
-                tables.append(current)
-            current = []
-    if inside and current:
-        joined = " ".join(current).lower()
-        if any(k in joined for k in ["profit after tax", "total income", "total expenses"]):
-            tables.append(current)
-    return tables
+    parts = split_cells(line)
+    value = parse_number(parts[column_index]) if column_index < len(parts) else None
+    return value if value is not None else 0.0
+
+# Step 4: Extract relevant tables (tokenized once into MarkdownTable objects)
+def extract_income_tables_from_markdown(markdown_text, labels=INCOME_STATEMENT_LABELS):
+    return extract_markdown_tables(markdown_text, labels)
+
+# Expenses are magnitudes: statements often print them in parentheses as deductions
+UNSIGNED_FIELDS = {"expenses"}
+
 
 # Step 5: Parse tables
-def parse_income_statement_tables(tables, submitted_net_income=None):
+def parse_income_statement_tables(tables, submitted_net_income=None, labels=INCOME_STATEMENT_LABELS):
     parsed = []
     for table in tables:
-        headers = [h.strip() for h in table[0].split("|") if h.strip()]
-        latest_index = next((i for i, h in enumerate(headers) if re.match(r"Q\d\s*FY\d+|FY\d+Q\d", h, re.I)), 1)
-        entry = {
-            "quarter": headers[latest_index] if latest_index < len(headers) else "LatestQuarter",
-            "revenues": 0.0,
-            "expenses": 0.0,
-            "netIncome": 0.0,
-            "grossProfit": 0.0,
-            "profitMarginPercent": 0.0,
-            "submittedNetIncome": submitted_net_income,
-            "calculatedNetIncome": 0.0,
-            "isValid": None
-        }
-        for line in table:
-            lower_line = line.lower()
-            if "total income" in lower_line and "operations" not in lower_line:
-                entry["revenues"] = extract_number_from_column(line, latest_index)
-            elif "total expenses" in lower_line:
-                entry["expenses"] = extract_number_from_column(line, latest_index)
-            elif "profit after tax" in lower_line and "margin" not in lower_line:
-                entry["netIncome"] = extract_number_from_column(line, latest_index)
-        entry["grossProfit"] = entry["revenues"] - entry["expenses"]
-        if entry["revenues"] > 0:
-            entry["profitMarginPercent"] = round((entry["netIncome"] / entry["revenues"]) * 100, 2)
-        if submitted_net_income is not None:
-            entry["calculatedNetIncome"] = entry["netIncome"]
-            entry["isValid"] = (submitted_net_income == entry["netIncome"])
-        if entry["netIncome"] > 0:
+        if not isinstance(table, MarkdownTable):
+            table = MarkdownTable(table)
+        headers = table.headers
+        latest_index = table.latest_period_column()
+        entry = StatementRow(quarter=headers[latest_index] if latest_index < len(headers) else "LatestQuarter")
+        for row_index, line in enumerate(table.lines):
+            field = labels.classify(line)
+            if field is not None:
+                value = table.number(row_index, latest_index)
+                setattr(entry, field, abs(value) if field in UNSIGNED_FIELDS else value)
+        entry.grossProfit = entry.revenues - entry.expenses
+        if entry.revenues > 0:
+            entry.profitMarginPercent = round((entry.netIncome / entry.revenues) * 100, 2)
+        apply_submitted_net_income(entry, submitted_net_income)
+        if entry.netIncome > 0:
             parsed.append(entry)
     return parsed
 
-# Step 6: Main extraction + validation function
-def extract_and_validate_income_statements(pdf_path, submitted_net_income=None):
-    start = time.time()
-    matched_pages = find_income_statement_pages(pdf_path)
-    if not matched_pages:
-        return []
-    filtered_pdf_path = extract_pages_to_temp_pdf(pdf_path, matched_pages)
-    converter = DocumentConverter()
-    result = converter.convert(filtered_pdf_path)
-    markdown = result.document.export_to_markdown()
-    tables = extract_income_tables_from_markdown(markdown)
-    parsed_data = parse_income_statement_tables(tables, submitted_net_income)
-    for entry in parsed_data:
-        entry["fileName"] = os.path.basename(pdf_path)
-        entry["filteredPDF"] = os.path.basename(filtered_pdf_path)
-        entry["pageCount"] = len(result.document.pages)
-        entry["processingTimeSeconds"] = round(time.time() - start, 2)
-    return parsed_data
+# Step 5b: Compare a parsed entry against the submitted net income
+def apply_submitted_net_income(entry, submitted_net_income):
+    entry.submittedNetIncome = submitted_net_income
+    if submitted_net_income is not None:
+        entry.calculatedNetIncome = entry.netIncome
+        entry.isValid = (submitted_net_income == entry.netIncome)
+    else:
+        entry.calculatedNetIncome = 0.0
+        entry.isValid = None
+    return entry
 
-# Step 7: LangChain-compatible tool
-@tool
-def validate_uploaded_pdfs(validation_requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Validate uploaded financial PDFs using extracted income statements."""
-    results = []
+# Step 6: Content-addressed cache key (file bytes + parser configuration)
+def hash_file(pdf_path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def extraction_cache_key(content_hash):
+    # OCR settings change what scanned pages yield
+    config = f"{PARSER_VERSION}|{registry_fingerprint()}|ocr:{OCR_DPI}:{','.join(OCR_LANGUAGES)}"
+    return hashlib.sha256(f"{content_hash}:{config}".encode("utf-8")).hexdigest()
+
+
+# Step 7: Expensive, submission-independent part: pages -> docling markdown -> parsed rows
+def build_extraction(schema_name, matched_pages, markdown="", page_count=0, method=None, fingerprints=None):
+    schema = get_schema(schema_name) if schema_name else None
+    rows = []
+    if markdown and schema is not None and schema.labels is not None:
+        with span("table_parsing", schema=schema_name) as parsing:
+            tables = extract_income_tables_from_markdown(markdown, schema.labels)
+            rows = parse_income_statement_tables(tables, labels=schema.labels)
+            parsing.set_attributes({"tables": len(tables), "rows": len(rows)})
+    return {
+        "schema": schema_name,
+        "matchedPages": matched_pages,
+        "markdown": markdown,
+        # Plain dicts: extractions are cached as JSON
+        "rows": [row.to_dict() for row in rows],
+        "pageCount": page_count,
+        "extractionMethod": method,
+        "pageFingerprints": fingerprints or {}
+    }
+
+
+def page_cache_key(fingerprint, ocr=None):
+    profile = "digital" if ocr is None else f"ocr:{ocr[0]}:{','.join(ocr[1])}"
+    return hashlib.sha256(f"{fingerprint}:{PARSER_VERSION}|{profile}".encode("utf-8")).hexdigest()
+
+
+def convert_pages(doc, pages, name, ocr=None):
+    """Docling markdown per page (``{page_index: markdown}``) plus the page fingerprints.
+
+    Pages whose fingerprint was converted before (in any document) are served from the
+    page cache; only new or changed pages are copied into a PDF and converted.
+    """
+    with span("page_fingerprints", pages=len(pages)):
+        fingerprints = {page: page_fingerprint(doc, page) for page in pages}
+    markdown = {}
+    if page_cache is not None:
+        with span("page_cache.lookup", pages=len(pages)) as lookup:
+            for page in pages:
+                cached = page_cache.get(page_cache_key(fingerprints[page], ocr))
+                if cached is not None:
+                    markdown[page] = cached["markdown"]
+            lookup.set_attribute("hits", len(markdown))
+    changed = [page for page in pages if page not in markdown]
+
+    if changed:
+        for page, page_markdown in zip(changed, convert_changed_pages(doc, changed, name, ocr)):
+            markdown[page] = page_markdown
+            if page_cache is not None:
+                page_cache.set(page_cache_key(fingerprints[page], ocr), {"markdown": page_markdown})
+    return markdown, fingerprints
+
+
+def convert_changed_pages(doc, pages, name, ocr=None):
+    """Markdown of ``pages``, in order. Long runs are converted as parallel shards, but
+    only in the API process: validation and job workers would each start their own
+    shard pool and multiply the processes and converters in memory."""
+    if PAGE_CONVERSION_WORKERS > 1 and len(pages) > PAGE_SHARD_SIZE and not in_worker_process():
+        return convert_pages_in_shards(doc, pages, name, ocr)
+    source = extract_pages_to_pdf_stream(doc, pages, name)
+    with get_converter_pool(ocr=ocr).borrow() as converter:
+        with span("docling.convert", ocr=ocr is not None, pages=len(pages)):
+            result = converter.convert(source)
+    with span("docling.export_markdown"):
+        return [result.document.export_to_markdown(page_no=i + 1) for i in range(len(pages))]
+
+
+# Step 7b: Page-level parallel conversion (shards of pages across warm worker processes)
+_page_pool = None
+_page_pool_lock = threading.Lock()
+
+
+def get_page_conversion_pool():
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            _page_pool = ProcessPoolExecutor(
+                max_workers=PAGE_CONVERSION_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker_converter_pool
+            )
+        return _page_pool
+
+
+def idle_shard_worker(seconds):
+    # A task defined here makes the worker import this module while warming up
+    time.sleep(seconds)
+
+
+def warm_page_conversion_pool():
+    """Start every shard worker (each loads its converters) before the first long statement."""
+    if PAGE_CONVERSION_WORKERS <= 1:
+        return
+    pool = get_page_conversion_pool()
+    # Overlapping no-op tasks make the executor spawn all of its workers now
+    list(pool.map(idle_shard_worker, [0.2] * PAGE_CONVERSION_WORKERS))
+
+
+def shutdown_page_conversion_pool():
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is not None:
+            _page_pool.shutdown(wait=False, cancel_futures=True)
+            _page_pool = None
+
+
+def terminate_pool(pool):
+    """Kill ``pool``'s workers, busy or not, and shut it down."""
+    # ProcessPoolExecutor has no public way to stop busy workers before Python 3.14
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def recycle_page_conversion_pool(pool):
+    """Drop a broken or stuck shard pool; the next document gets fresh workers."""
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is pool:
+            _page_pool = None
+    terminate_pool(pool)
+
+
+def convert_page_shard(pdf_bytes, name, page_count, ocr=None, traceparent=None):
+    """Worker task: convert one shard (a small PDF) and return its markdown page by page."""
+    with span("docling.convert_shard", traceparent=traceparent, ocr=ocr is not None, pages=page_count):
+        with get_converter_pool(ocr=ocr).borrow() as converter:
+            result = converter.convert(DocumentStream(name=name, stream=BytesIO(pdf_bytes)))
+        return [result.document.export_to_markdown(page_no=i + 1) for i in range(page_count)]
+
+
+def run_page_shards(shard_pdfs, ocr, traceparent, deadline):
+    """Convert ``(pdf_bytes, name, page_count)`` shards on the pool before ``deadline``."""
+    pool = get_page_conversion_pool()
+    futures = []
     try:
-        for req in validation_requests:
-            file_name = req["fileName"]
-            submitted_income = req.get("submittedNetIncome")
-            full_path = os.path.join(pdf_folder_path, file_name)
+        for pdf_bytes, shard_name, page_count in shard_pdfs:
+            futures.append(pool.submit(convert_page_shard, pdf_bytes, shard_name, page_count, ocr, traceparent))
+        done, not_done = wait(futures, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_EXCEPTION)
+        for future in done:
+            # Re-raises the first failed shard
+            future.result()
+        if not_done:
+            # Busy workers cannot be cancelled: recycling the pool frees them
+            recycle_page_conversion_pool(pool)
+            raise TimeoutError(f"Page conversion timed out after {VALIDATION_FILE_TIMEOUT} seconds")
+        # Shards are merged back in page order
+        return [markdown for future in futures for markdown in future.result()]
+    except (BrokenProcessPool, CancelledError):
+        # A shard worker died, here or in another document: later documents get a fresh pool
+        recycle_page_conversion_pool(pool)
+        raise
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
 
-            try:
-                parsed = extract_and_validate_income_statements(
-                    full_path,
-                    submitted_net_income=submitted_income
-                )
-                results.extend(parsed)
-            except Exception as e:
-                results.append({"fileName": file_name, "error": str(e)})
-
-    finally:
-        cleanup_temp_folder()  #  Always cleanup temp files
+
+def convert_pages_in_shards(doc, pages, name, ocr=None):
+    shards = [pages[i:i + PAGE_SHARD_SIZE] for i in range(0, len(pages), PAGE_SHARD_SIZE)]
+    base = os.path.splitext(name)[0]
+    shard_pdfs = [
+        (extract_pages_to_pdf_bytes(doc, shard), f"{base}_part{i + 1}.pdf", len(shard))
+        for i, shard in enumerate(shards)
+    ]
+    traceparent = current_traceparent()
+    # One deadline for the whole document, however many shards it has
+    deadline = time.monotonic() + VALIDATION_FILE_TIMEOUT
+    with span("docling.convert", ocr=ocr is not None, pages=len(pages), shards=len(shards)):
+        try:
+            return run_page_shards(shard_pdfs, ocr, traceparent, deadline)
+        except (BrokenProcessPool, CancelledError):
+            # Lost to a dead worker: retried once on the fresh pool
+            return run_page_shards(shard_pdfs, ocr, traceparent, deadline)
+
+
+def join_page_markdown(markdown, pages):
+    return "\n\n".join(markdown[page] for page in pages)
+
+
+def extract_scanned_statement_rows(doc, scanned_pages, name):
+    # Scanned pages have no text to screen, so they are OCR'd first and screened on the OCR text
+    texts, fingerprints = convert_pages(doc, scanned_pages, name, ocr=(OCR_DPI, OCR_LANGUAGES))
+    schema_name, matched_pages = screen_schemas_in_texts(texts, enabled_schemas())
+    return build_extraction(
+        schema_name,
+        matched_pages,
+        join_page_markdown(texts, matched_pages),
+        len(scanned_pages),
+        "ocr",
+        {str(page): fingerprints[page] for page in matched_pages}
+    )
+
+
+def extract_income_statement_rows(pdf_path, page_hints=None):
+    # The PDF is parsed once; docling receives only pages of a recognised statement
+    # schema, as an in-memory stream, and converts them without OCR. Only when no
+    # digital page matches are the document's scanned pages (if any) sent to OCR.
+    # Documents without an income-statement schema (e.g. invoices) are never converted.
+    # Stored documents pass their known statement pages as page_hints, so only those are screened.
+    # Pages already converted before (same fingerprint) are not converted again.
+    base = os.path.splitext(os.path.basename(pdf_path))[0]
+    with fitz.open(pdf_path) as doc:
+        with span("page_screening", pageCount=len(doc), hinted=page_hints is not None) as screening:
+            # Text lengths measured while screening spare scan classification a second extraction
+            text_chars = {}
+            schema_name, matched_pages = detect_statement_pages(doc, page_hints=page_hints, text_chars=text_chars)
+            screening.set_attributes({"schema": schema_name or "none", "matchedPages": matched_pages})
+        if schema_name is None:
+            with span("scan_classification") as classification:
+                scanned_pages = find_scanned_pages(doc, OCR_MAX_PAGES, text_chars)
+                classification.set_attribute("scannedPages", scanned_pages)
+            if not scanned_pages:
+                return build_extraction(None, [])
+            return extract_scanned_statement_rows(doc, scanned_pages, f"{base}_scanned.pdf")
+
+        schema = get_schema(schema_name)
+        if schema is None or schema.labels is None:
+            return build_extraction(schema_name, matched_pages)
+        markdown, fingerprints = convert_pages(doc, matched_pages, f"{base}_filtered_income.pdf")
+    return build_extraction(
+        schema_name,
+        matched_pages,
+        join_page_markdown(markdown, matched_pages),
+        len(matched_pages),
+        "docling",
+        {str(page): fingerprints[page] for page in matched_pages}
+    )
+
+
+# Step 8: Main extraction + validation function
+def build_validation_entries(extraction, file_name, submitted_net_income, start):
+    filtered_pdf = f"{os.path.splitext(file_name)[0]}_filtered_income.pdf"
+    processing_time = round(time.time() - start, 2)
+    parsed_data = []
+    for row in extraction["rows"]:
+        entry = ValidationRow(
+            **row,
+            fileName=file_name,
+            filteredPDF=filtered_pdf,
+            pageCount=extraction["pageCount"],
+            schema=extraction.get("schema"),
+            extractionMethod=extraction.get("extractionMethod"),
+            processingTimeSeconds=processing_time
+        )
+        parsed_data.append(apply_submitted_net_income(entry, submitted_net_income))
+    return parsed_data
+
+
+def extract_and_validate_income_statements(
+    pdf_path,
+    submitted_net_income=None,
+    content_hash=None,
+    page_hints=None,
+    file_name=None
+):
+    start = time.time()
+    extraction = None
+    cache_key = None
+    if extraction_cache is not None:
+        with span("extraction_cache.lookup") as lookup:
+            # Uploads are hashed while they are streamed to disk; only hash here when called directly
+            cache_key = extraction_cache_key(content_hash or hash_file(pdf_path))
+            extraction = extraction_cache.get(cache_key)
+            lookup.set_attribute("hit", extraction is not None)
+    if extraction is None:
+        extraction = extract_income_statement_rows(pdf_path, page_hints)
+        if cache_key is not None:
+            extraction_cache.set(cache_key, extraction)
+    return build_validation_entries(extraction, file_name or os.path.basename(pdf_path), submitted_net_income, start)
+
+
+def validate_known_document(content_hash, submitted_net_income=None, file_name=None):
+    """Validate a document that was extracted before, by its SHA-256, without its bytes."""
+    start = time.time()
+    extraction = extraction_cache.get(extraction_cache_key(content_hash)) if extraction_cache is not None else None
+    if extraction is None:
+        raise LookupError(f"No stored extraction for document {content_hash}; upload the PDF instead.")
+    return build_validation_entries(extraction, file_name or content_hash, submitted_net_income, start)
+
+# Step 9: Validate one uploaded file, turning failures into a per-file error entry
+def run_single_validation(req):
+    file_name = req["fileName"]
+    # Uploads live in per-request workspaces; bare file names resolve against app/temp
+    full_path = req.get("filePath") or os.path.join(pdf_folder_path, file_name)
+    # Requests fanned out to worker processes carry the caller's trace context
+    with span("validate_file", traceparent=req.get("traceparent"), fileName=file_name) as file_span:
+        try:
+            if not req.get("filePath") and req.get("contentHash") and not os.path.exists(full_path):
+                # Reference to an already-extracted document (bulk manifests)
+                return validate_known_document(req["contentHash"], req.get("submittedNetIncome"), file_name)
+            return extract_and_validate_income_statements(
+                full_path,
+                submitted_net_income=req.get("submittedNetIncome"),
+                content_hash=req.get("contentHash"),
+                page_hints=req.get("pageHints"),
+                file_name=file_name
+            )
+        except Exception as e:
+            file_span.set_attribute("error", str(e))
+            return [{"fileName": file_name, "error": str(e)}]
+
+
+def validate_single_pdf(req):
+    with collect_stage_timings() as timings:
+        results = run_single_validation(req)
+    stage_timings = {stage: round(seconds, 4) for stage, seconds in timings.items()}
+    for entry in results:
+        entry["stageTimingsSeconds"] = stage_timings
     return results
 
 
-@tool
-def summarize_financials(results: list) -> str:
+def traced_requests(validation_requests):
+    traceparent = current_traceparent()
+    return [dict(req, traceparent=traceparent) for req in validation_requests] if traceparent else validation_requests
+
+
+# Step 10: Process pool for per-file parallel validation (workers keep warm converters)
+_validation_pool = None
+_validation_pool_workers = 0
+_validation_pool_lock = threading.Lock()
+# Workers report each file they begin on their pool's ``started_files`` queue; the
+# API side notes when it saw the report, keyed by the token sent with the file
+_started_files = None
+_file_tokens = itertools.count()
+_file_starts = {}
+_file_starts_lock = threading.Lock()
+
+
+def init_validation_worker(started_files):
+    """Process-pool initializer: warm the converter and keep the file-start queue."""
+    global _started_files
+    _started_files = started_files
+    init_worker_converter_pool()
+
+
+def validate_file_in_worker(token, req):
+    # Files wait in the executor's call queue before a worker takes them: the
+    # per-file timeout starts here, not at submit time
+    _started_files.put(token)
+    # This process's spans are not served; they travel back to the API process's /metrics
+    with collect_stage_observations() as observations:
+        results = validate_single_pdf(req)
+    return results, observations
+
+
+def get_validation_pool(max_workers):
+    global _validation_pool, _validation_pool_workers
+    with _validation_pool_lock:
+        if _validation_pool is None or _validation_pool_workers != max_workers:
+            if _validation_pool is not None:
+                _validation_pool.shutdown(wait=False)
+            context = multiprocessing.get_context("spawn")
+            started_files = context.Queue()
+            _validation_pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=context,
+                initializer=init_validation_worker,
+                initargs=(started_files,)
+            )
+            _validation_pool.started_files = started_files
+            _validation_pool_workers = max_workers
+        return _validation_pool
+
+
+def file_start_times(pool):
+    """Drain ``pool``'s start reports; returns the shared token -> start time map."""
+    with _file_starts_lock:
+        while True:
+            try:
+                token = pool.started_files.get_nowait()
+            except (queue.Empty, OSError, ValueError):
+                break
+            _file_starts[token] = time.monotonic()
+    return _file_starts
+
+
+def shutdown_validation_pool():
+    global _validation_pool
+    with _validation_pool_lock:
+        if _validation_pool is not None:
+            _validation_pool.shutdown(wait=False, cancel_futures=True)
+            _validation_pool = None
+
+
+def recycle_validation_pool(pool):
+    """Kill ``pool``'s workers and drop it, so the next caller gets fresh processes.
+
+    A running docling conversion cannot be cancelled, so this is the only way to
+    free the worker (and its converter) behind a file that timed out.
     """
-    Summarize validated income statement results using both zero-shot and few-shot prompting.
-    Combines example-based reasoning with task-specific instructions.
+    global _validation_pool
+    with _validation_pool_lock:
+        if _validation_pool is pool:
+            _validation_pool = None
+    terminate_pool(pool)
+
+
+def iter_parallel_validations(validation_requests, max_workers, file_timeout):
+    """Yield ``(request, results)`` from the process pool as files finish.
+
+    A file that runs longer than ``file_timeout`` seconds after a worker picked it up
+    gets an error entry and the pool is recycled; the other files it was running or holding are
+    resubmitted to the fresh pool. Files lost because a worker died for another
+    reason (e.g. another request recycled the shared pool) are retried once.
     """
-    llm = ChatOllama(model="mistral")
+    pending = list(enumerate(zip(validation_requests, traced_requests(validation_requests))))
+    retried = set()
+    poll_interval = min(1.0, file_timeout)
+    while pending:
+        pool = get_validation_pool(max_workers)
+        futures = {}
+        for position, (req, traced) in pending:
+            token = next(_file_tokens)
+            try:
+                futures[pool.submit(validate_file_in_worker, token, traced)] = (position, req, traced, token)
+            except BrokenProcessPool:
+                recycle_validation_pool(pool)
+                break
+        pending = pending[len(futures):]
+        while futures:
+            done, _ = wait(futures, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            for future in done:
+                position, req, traced, token = futures.pop(future)
+                _file_starts.pop(token, None)
+                try:
+                    file_results, observations = future.result()
+                except (BrokenProcessPool, CancelledError):
+                    if position not in retried:
+                        retried.add(position)
+                        pending.append((position, (req, traced)))
+                        continue
+                    yield req, [{"fileName": req["fileName"], "error": "Validation worker process exited"}]
+                    continue
+                except Exception as e:
+                    yield req, [{"fileName": req["fileName"], "error": str(e)}]
+                    continue
+                replay_stage_observations(observations)
+                yield req, file_results
+
+            starts = file_start_times(pool)
+            now = time.monotonic()
+            expired = [
+                future for future, (_, _, _, token) in futures.items()
+                if token in starts and now - starts[token] > file_timeout
+            ]
+            if expired:
+                for future in expired:
+                    _, req, _, token = futures.pop(future)
+                    _file_starts.pop(token, None)
+                    yield req, [{"fileName": req["fileName"], "error": f"Timed out after {file_timeout} seconds"}]
+                recycle_validation_pool(pool)
+                for position, req, traced, token in futures.values():
+                    _file_starts.pop(token, None)
+                    pending.append((position, (req, traced)))
+                futures = {}
 
-    few_shot_examples = """
-    Example 1:
-    Revenue: 5000, Net Income: 1000 → Profit Margin = 20%
-    Previous Net Income: 800 → YoY Growth = 25%
 
-    Example 2:
-    Revenue: 7000, Net Income: 1400 → Profit Margin = 20%
-    Previous Net Income: 1000 → YoY Growth = 40%
+def validate_pdfs_in_parallel(validation_requests, max_workers, file_timeout):
+    """Fan files out across the process pool; results come back in input order."""
+    positions = {id(req): position for position, req in enumerate(validation_requests)}
+    finished = sorted(
+        iter_parallel_validations(validation_requests, max_workers, file_timeout),
+        key=lambda item: positions[id(item[0])]
+    )
+    return [entry for _, file_results in finished for entry in file_results]
+
+
+def iter_validated_pdfs(validation_requests, max_workers=None, file_timeout=None):
+    """Yield ``(request, results)`` per file as soon as that file is finished.
+
+    In parallel mode files complete in any order; callers that need input order
+    should use ``validate_uploaded_pdfs`` instead.
     """
+    max_workers = max_workers or VALIDATION_WORKERS
+    file_timeout = file_timeout or VALIDATION_FILE_TIMEOUT
+    if max_workers <= 1 or len(validation_requests) <= 1 or in_worker_process():
+        for req in validation_requests:
+            yield req, validate_single_pdf(req)
+        return
+    yield from iter_parallel_validations(validation_requests, max_workers, file_timeout)
+
+
+# Step 11: LangChain-compatible tool
+@tool
+def validate_uploaded_pdfs(
+    validation_requests: List[Dict[str, Any]],
+    max_workers: Optional[int] = None,
+    file_timeout: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """Validate uploaded financial PDFs using extracted income statements."""
+    max_workers = max_workers or VALIDATION_WORKERS
+    file_timeout = file_timeout or VALIDATION_FILE_TIMEOUT
+    # Uploaded files belong to the caller's workspace, which the caller releases.
+    # Job workers validate serially: a nested pool would load docling once more per file worker.
+    if max_workers > 1 and len(validation_requests) > 1 and not in_worker_process():
+        return validate_pdfs_in_parallel(validation_requests, max_workers, file_timeout)
+    results = []
+    for req in validation_requests:
+        results.extend(validate_single_pdf(req))
+    return results
+
+
+# Step 12: Summary prompt. Margins, growth and the validation table are computed
+# deterministically in app.metrics; the LLM only writes the narrative around them.
+SUMMARY_MODES = ("none", "template", "llm")
+SUMMARY_PROMPT_VERSION = "3"
+
+
+summary_cache = create_summary_cache()
 
-    zero_shot_instruction = """
-    You are a financial analysis assistant. Based on the following income statement validation results, perform:
-    1. Performance analysis of the latest quarters for each fiscal year.
-    2. Calculate:
-    - Net Profit Margin = Net Income / Revenue
-    - YoY Growth = (Current - Previous) / Previous for Net Income
-    3. Identify if submitted net income matches calculated net income.
-    4. Display the extracted income statement table in Markdown format.
-    5. Write a short conclusion on overall accuracy and growth trends.
-    6. Output all results clearly and professionally.
+
+def build_summary_prompt(results):
+    instruction = """
+    You are a financial analysis assistant. The metrics below were already computed exactly;
+    do not recalculate them. Based on them:
+    1. Briefly analyse performance of the latest quarters (margins, QoQ and YoY net income growth).
+    2. Call out every validation mismatch or extraction failure.
+    3. Reproduce the table in Markdown format.
+    4. Write a short conclusion on overall accuracy and growth trends.
     """
+    return instruction + "\n\nData:\n" + build_digest(results)
+
+
+def stream_summary(results, mode="llm"):
+    """Yield the summary text chunk by chunk as the LLM produces it."""
+    if mode != "llm":
+        summary = generate_summary(results, mode)
+        if summary:
+            yield summary
+        return
+    cache_key = summary_cache_key(results, OLLAMA_MODEL, SUMMARY_PROMPT_VERSION)
+    cached = summary_cache.get(cache_key) if summary_cache is not None else None
+    if cached is not None:
+        yield cached
+        return
+    chunks = []
+    # Timed by hand: a span must not stay open across yields, which may resume in another thread
+    start = time.perf_counter()
+    for chunk in get_summary_scheduler().stream(build_summary_prompt(results)):
+        chunks.append(chunk)
+        yield chunk
+    record_stage("llm.stream", time.perf_counter() - start)
+    if summary_cache is not None:
+        summary_cache.set(cache_key, "".join(chunks))
+
 
-    # Combine both sections
-    prompt = few_shot_examples + "\n\n" + zero_shot_instruction + "\n\nData:\n" + str(results)
+@tool
+def summarize_financials(results: list, priority: str = "interactive") -> str:
+    """
+    Summarize validated income statement results with the LLM.
+    The prompt carries a precomputed metrics digest instead of the raw results.
+    """
+    with span("llm.summary", priority=priority, model=OLLAMA_MODEL) as summary_span:
+        cache_key = summary_cache_key(results, OLLAMA_MODEL, SUMMARY_PROMPT_VERSION)
+        if summary_cache is not None:
+            cached = summary_cache.get(cache_key)
+            summary_span.set_attribute("cacheHit", cached is not None)
+            if cached is not None:
+                return cached
+        # Concurrent requests share the scheduler: identical prompts become one call and
+        # interactive requests are served before bulk ones.
+        summary = get_summary_scheduler().submit(build_summary_prompt(results), priority).result()
+        if summary_cache is not None:
+            summary_cache.set(cache_key, summary)
+        return summary
 
-    response = llm.invoke([HumanMessage(content=prompt)])
-    return response.content
 
+def generate_summary(results, mode="llm", priority="interactive"):
+    """Summary for ``mode``: "none" (skip), "template" (deterministic, no LLM) or "llm"."""
+    if mode == "none":
+        return ""
+    if mode == "template":
+        with span("summary.template"):
+            return render_template_summary(results)
+    return summarize_financials.func(results, priority)
@@ -0,0 +1,257 @@
+import contextvars
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+
+from app.config import TRACING_ENABLED, TRACE_BUFFER_SIZE
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+_stage_timings = contextvars.ContextVar("stage_timings", default=None)
+_stage_observations = contextvars.ContextVar("stage_observations", default=None)
+
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+class Span:
+    """A finished or running unit of work, with OpenTelemetry's span fields."""
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_span_id",
+        "start_time_unix_nano", "end_time_unix_nano", "attributes", "status", "status_message"
+    )
+
+    def __init__(self, name, trace_id, parent_span_id=None, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent_span_id
+        self.start_time_unix_nano = time.time_ns()
+        self.end_time_unix_nano = None
+        self.attributes = dict(attributes or {})
+        self.status = "UNSET"
+        self.status_message = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes):
+        self.attributes.update(attributes)
+
+    @property
+    def duration_seconds(self):
+        end = self.end_time_unix_nano or time.time_ns()
+        return (end - self.start_time_unix_nano) / 1e9
+
+    @property
+    def traceparent(self):
+        """W3C trace context header, used to continue the trace in worker processes."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id,
+            "startTimeUnixNano": self.start_time_unix_nano,
+            "endTimeUnixNano": self.end_time_unix_nano,
+            "durationSeconds": round(self.duration_seconds, 6),
+            "attributes": self.attributes,
+            "status": {"code": self.status, "message": self.status_message}
+        }
+
+
+class InMemorySpanExporter:
+    """Keeps the most recent finished spans, like OpenTelemetry's in-memory exporter."""
+
+    def __init__(self, max_spans=TRACE_BUFFER_SIZE):
+        self._spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        with self._lock:
+            self._spans.extend(spans)
+
+    def get_finished_spans(self):
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+    def shutdown(self):
+        self.clear()
+
+
+class Histogram:
+    """Prometheus histogram with a single label."""
+
+    def __init__(self, name, help_text, label, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = sorted(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_value, value):
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            index = bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series["counts"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_value, series in sorted(self._series.items()):
+                label = f'{self.label}="{escape_label(label_value)}"'
+                cumulative = 0
+                for bound, count in zip(self.buckets, series["counts"]):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{{{label},le="{bound:g}"}} {cumulative}')
+                lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {series["count"]}')
+                lines.append(f"{self.name}_sum{{{label}}} {series['sum']:.6f}")
+                lines.append(f"{self.name}_count{{{label}}} {series['count']}")
+        return "\n".join(lines)
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+span_exporter = InMemorySpanExporter()
+_exporters = [span_exporter]
+
+STAGE_DURATION = Histogram(
+    "financial_agent_stage_duration_seconds",
+    "Duration of pipeline stages (page screening, docling, table parsing, LLM, ...).",
+    "stage",
+    [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300]
+)
+STAGE_ERRORS = {}
+_errors_lock = threading.Lock()
+
+
+def add_span_exporter(exporter):
+    """Register another exporter (any object with ``export(spans)``), e.g. an OTLP bridge."""
+    _exporters.append(exporter)
+
+
+def record_stage(name, seconds, failed=False):
+    STAGE_DURATION.observe(name, seconds)
+    if failed:
+        with _errors_lock:
+            STAGE_ERRORS[name] = STAGE_ERRORS.get(name, 0) + 1
+    timings = _stage_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+    observations = _stage_observations.get()
+    if observations is not None:
+        observations.append((name, seconds, failed))
+
+
+def parse_traceparent(traceparent):
+    match = TRACEPARENT_PATTERN.match(traceparent or "")
+    return (match.group(1), match.group(2)) if match else (None, None)
+
+
+# Step 1: Spans as context managers; the active span lives in a context variable
+@contextmanager
+def span(name, traceparent=None, **attributes):
+    """Time a pipeline stage as a child of the active span (or of ``traceparent``).
+
+    Yields the span so callers can add attributes such as matched pages. Every span
+    also feeds the stage duration histogram served at ``/metrics``.
+    """
+    if not TRACING_ENABLED:
+        start = time.perf_counter()
+        try:
+            yield Span(name, None)
+        finally:
+            record_stage(name, time.perf_counter() - start)
+        return
+
+    parent = _current_span.get()
+    if parent is not None:
+        trace_id, parent_span_id = parent.trace_id, parent.span_id
+    else:
+        trace_id, parent_span_id = parse_traceparent(traceparent)
+    current = Span(name, trace_id or os.urandom(16).hex(), parent_span_id, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+        current.status = "OK"
+    except BaseException as e:
+        current.status = "ERROR"
+        current.status_message = str(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end_time_unix_nano = time.time_ns()
+        record_stage(name, current.duration_seconds, failed=current.status == "ERROR")
+        for exporter in _exporters:
+            exporter.export([current])
+
+
+def current_traceparent():
+    current = _current_span.get()
+    return current.traceparent if current is not None and current.trace_id else None
+
+
+@contextmanager
+def collect_stage_timings():
+    """Collect ``{stage: seconds}`` for every span finished inside the block."""
+    timings = {}
+    token = _stage_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _stage_timings.reset(token)
+
+
+@contextmanager
+def collect_stage_observations():
+    """Collect ``(stage, seconds, failed)`` for every span finished inside the block.
+
+    Worker processes return them with their task's result; the API process replays
+    them, so each worker span is observed exactly once in the served ``/metrics``.
+    """
+    observations = []
+    token = _stage_observations.set(observations)
+    try:
+        yield observations
+    finally:
+        _stage_observations.reset(token)
+
+
+def replay_stage_observations(observations):
+    for name, seconds, failed in observations or []:
+        record_stage(name, seconds, failed)
+
+
+# Step 2: Prometheus text exposition
+def render_prometheus():
+    lines = [STAGE_DURATION.render()]
+    lines.append("# HELP financial_agent_stage_errors_total Pipeline stages that raised an exception.")
+    lines.append("# TYPE financial_agent_stage_errors_total counter")
+    with _errors_lock:
+        for name, count in sorted(STAGE_ERRORS.items()):
+            lines.append(f'financial_agent_stage_errors_total{{stage="{escape_label(name)}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+
+def recent_spans(limit=200, trace_id=None):
+    spans = span_exporter.get_finished_spans()
+    if trace_id:
+        spans = [s for s in spans if s.trace_id == trace_id]
+    return [s.to_dict() for s in spans[-limit:]]
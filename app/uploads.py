@@ -0,0 +1,95 @@
+import hashlib
+import os
+import re
+from uuid import uuid4
+
+from fastapi import HTTPException, UploadFile
+
+from app.config import UPLOAD_CHUNK_SIZE, MAX_UPLOAD_FILE_BYTES, MAX_UPLOAD_REQUEST_BYTES
+
+PDF_MAGIC = b"%PDF-"
+# The PDF spec allows a little junk before the header; readers look in the first 1 KiB
+PDF_MAGIC_WINDOW = 1024
+
+# Saved uploads are named "<uuid4 hex>_<original name>"
+UPLOAD_PREFIX = re.compile(r"\b[0-9a-f]{32}_")
+
+
+def original_filename(file_name):
+    return UPLOAD_PREFIX.sub("", file_name or "")
+
+
+def remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+async def save_upload(file: UploadFile, save_path, max_bytes=MAX_UPLOAD_FILE_BYTES):
+    """Stream an upload to disk in fixed-size chunks, hashing it on the way.
+
+    Rejects non-PDF content (415) after the first chunk and anything larger than
+    ``max_bytes`` (413) as soon as the limit is crossed, so bad uploads never reach
+    PyMuPDF or docling. Returns ``(size_in_bytes, sha256_hex)``.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"{file.filename} exceeds the upload size limit.")
+
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    try:
+        with open(save_path, "wb") as buffer:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if len(head) < PDF_MAGIC_WINDOW:
+                    head += chunk[:PDF_MAGIC_WINDOW - len(head)]
+                    if len(head) >= PDF_MAGIC_WINDOW and PDF_MAGIC not in head:
+                        raise HTTPException(status_code=415, detail=f"{file.filename} is not a PDF.")
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(status_code=413, detail=f"{file.filename} exceeds the upload size limit.")
+                digest.update(chunk)
+                buffer.write(chunk)
+        if PDF_MAGIC not in head:
+            raise HTTPException(status_code=415, detail=f"{file.filename} is not a PDF.")
+    except BaseException:
+        remove_quietly(save_path)
+        raise
+    return size, digest.hexdigest()
+
+
+async def save_uploads(files, folder, max_request_bytes=MAX_UPLOAD_REQUEST_BYTES):
+    """Save every upload of one request; enforces the per-request byte budget.
+
+    Returns a list of ``{"fileName", "filePath", "size", "contentHash"}`` dicts. If any
+    file is rejected, the files already saved for this request are removed.
+    """
+    os.makedirs(folder, exist_ok=True)
+    saved = []
+    remaining = max_request_bytes
+    try:
+        for file in files:
+            unique_filename = f"{uuid4().hex}_{os.path.basename(file.filename or 'upload.pdf')}"
+            save_path = os.path.join(folder, unique_filename)
+            try:
+                size, content_hash = await save_upload(file, save_path, max_bytes=min(MAX_UPLOAD_FILE_BYTES, remaining))
+            except HTTPException as e:
+                if e.status_code == 413 and remaining < MAX_UPLOAD_FILE_BYTES:
+                    raise HTTPException(status_code=413, detail="Request exceeds the total upload size limit.")
+                raise
+            remaining -= size
+            saved.append({
+                "fileName": unique_filename,
+                "filePath": save_path,
+                "size": size,
+                "contentHash": content_hash
+            })
+    except BaseException:
+        for upload in saved:
+            remove_quietly(upload["filePath"])
+        raise
+    return saved
@@ -0,0 +1,54 @@
+import asyncio
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from uuid import uuid4
+
+from app.config import WORKSPACE_ROOT, WORKSPACE_MAX_AGE, WORKSPACE_JANITOR_INTERVAL
+
+
+def create_workspace(root=WORKSPACE_ROOT):
+    """Create a private directory for one request's uploads."""
+    path = os.path.join(root, uuid4().hex)
+    os.makedirs(path)
+    return path
+
+
+def release_workspace(path):
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@contextmanager
+def request_workspace(root=WORKSPACE_ROOT):
+    """Workspace for a request that finishes with its response (streams and jobs release theirs later)."""
+    path = create_workspace(root)
+    try:
+        yield path
+    finally:
+        release_workspace(path)
+
+
+def cleanup_orphaned_workspaces(root=WORKSPACE_ROOT, max_age=WORKSPACE_MAX_AGE):
+    """Remove workspaces left behind by crashed or killed requests."""
+    if not os.path.isdir(root):
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for entry in os.scandir(root):
+        try:
+            if entry.is_dir(follow_symlinks=False) and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed += 1
+        except OSError:
+            continue
+    if removed:
+        print(f"\n✅ Removed {removed} orphaned workspace(s) from {root}")
+    return removed
+
+
+async def run_workspace_janitor(interval=WORKSPACE_JANITOR_INTERVAL):
+    """Periodically sweep orphaned workspaces; runs as a task for the app's lifetime."""
+    while True:
+        await asyncio.to_thread(cleanup_orphaned_workspaces)
+        await asyncio.sleep(interval)
@@ -0,0 +1,252 @@
+"""Stage-level benchmarks over the sample PDFs under data/.
+
+Runs every PDF through the production pipeline (``validate_uploaded_pdfs`` for
+statements and scans, ``validate_invoices`` for data/invoices) and the LLM
+summary against a local stub LLM, then reports p50/p95 per stage and the peak
+RSS as JSON. Stages are the pipeline's own spans (``page_screening``,
+``docling.convert``, ``table_parsing``, ...). Each mode runs in its own process,
+so its ``peakRssBytes`` is not inflated by the other mode.
+
+    python -m benchmarks.run_benchmarks --runs 5 --mode both --output bench.json
+
+``cold`` runs drop the converters (reloading them is timed as ``converterWarmUp``)
+and page screeners on every run; ``warm`` runs reuse converters warmed before timing
+starts. Caches are off unless ``--caches`` is given (then they start empty and the
+warm-up pass fills them); ``--validation-workers`` / ``--page-workers`` set
+``VALIDATION_WORKERS`` / ``PAGE_CONVERSION_WORKERS`` for the measured processes.
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from langchain_core.messages import AIMessage
+
+from app.config import VALIDATION_WORKERS
+from app.converter_pool import drop_converter_pools, init_converter_pool
+from app.invoices import validate_invoices
+from app.llm_scheduler import SummaryScheduler
+from app.page_screening import get_page_screener
+from app.tools import (
+    PARSER_VERSION,
+    build_summary_prompt,
+    shutdown_page_conversion_pool,
+    shutdown_validation_pool,
+    validate_uploaded_pdfs,
+)
+from app.tracing import collect_stage_observations
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+MODES = ("cold", "warm")
+# Sub-folder of data/ whose PDFs go through the invoice route
+INVOICE_CATEGORY = "invoices"
+
+
+class StubLLM:
+    """Stands in for ChatOllama: answers every prompt after a fixed delay."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def invoke(self, messages):
+        time.sleep(self.latency)
+        return AIMessage(content=f"Stub summary of {len(messages[-1].content)} prompt characters.")
+
+
+class StageTimer:
+    def __init__(self):
+        self.samples = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples.setdefault(name, []).append(time.perf_counter() - start)
+
+
+def percentile(values, q):
+    """Linear-interpolated percentile of ``values`` (``q`` in 0..100)."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize_samples(samples):
+    return {
+        name: {
+            "count": len(values),
+            "p50": round(percentile(values, 50), 6),
+            "p95": round(percentile(values, 95), 6),
+            "mean": round(sum(values) / len(values), 6),
+            "max": round(max(values), 6)
+        }
+        for name, values in sorted(samples.items())
+    }
+
+
+def peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def find_sample_pdfs(data_dir=DATA_DIR):
+    """``[(category, path)]`` for every PDF under data/, category = its sub-folder."""
+    paths = sorted(glob.glob(os.path.join(data_dir, "**", "*.pdf"), recursive=True))
+    return [(os.path.basename(os.path.dirname(path)), path) for path in paths]
+
+
+# Step 1: One file through the same functions the routes call
+def benchmark_file(category, path, timer):
+    name = os.path.basename(path)
+    start = time.perf_counter()
+    with collect_stage_observations() as observations:
+        if category == INVOICE_CATEGORY:
+            validate_invoices([{"fileName": name, "filePath": path, "submittedAmount": 0.0}])
+            rows = []
+        else:
+            rows = validate_uploaded_pdfs.func([{"fileName": name, "filePath": path}])
+    timer.samples.setdefault(f"file:{name}", []).append(time.perf_counter() - start)
+    for stage, seconds, _ in observations:
+        timer.samples.setdefault(stage, []).append(seconds)
+    return [row for row in rows if "error" not in row]
+
+
+def benchmark_batch(pdfs, timer):
+    """All statements of a run as one request, fanned out across ``VALIDATION_WORKERS``."""
+    requests = [
+        {"fileName": os.path.basename(path), "filePath": path}
+        for category, path in pdfs if category != INVOICE_CATEGORY
+    ]
+    with timer.stage("validationBatch"):
+        validate_uploaded_pdfs.func(requests)
+
+
+# Step 2: Summary over a run's rows, through the real scheduler and prompt builder
+def benchmark_summary(rows, scheduler, timer):
+    with timer.stage("summaryPrompt"):
+        prompt = build_summary_prompt(rows)
+    with timer.stage("summary"):
+        scheduler.submit(prompt).result()
+
+
+def run_mode(mode, pdfs, runs, llm_latency):
+    timer = StageTimer()
+    scheduler = SummaryScheduler(window=0, llm_factory=lambda: StubLLM(llm_latency))
+    if mode == "warm":
+        # One untimed pass loads the converters and fills the OS page cache (and the caches, if on)
+        init_converter_pool()
+        for category, path in pdfs:
+            benchmark_file(category, path, StageTimer())
+
+    for run in range(runs):
+        if mode == "cold":
+            drop_converter_pools()
+            get_page_screener.cache_clear()
+            with timer.stage("converterWarmUp"):
+                init_converter_pool()
+        rows = []
+        for category, path in pdfs:
+            print(f"⏱️ [{mode} {run + 1}/{runs}] {category}/{os.path.basename(path)}", file=sys.stderr)
+            rows.extend(benchmark_file(category, path, timer))
+        if VALIDATION_WORKERS > 1:
+            benchmark_batch(pdfs, timer)
+        benchmark_summary(rows, scheduler, timer)
+    shutdown_validation_pool()
+    shutdown_page_conversion_pool()
+
+    stages = {k: v for k, v in timer.samples.items() if not k.startswith("file:")}
+    files = {k[len("file:"):]: v for k, v in timer.samples.items() if k.startswith("file:")}
+    return {
+        "stages": summarize_samples(stages),
+        "files": summarize_samples(files),
+        "peakRssBytes": peak_rss_bytes()
+    }
+
+
+def run_mode_isolated(mode, pdfs, runs, llm_latency):
+    """``run_mode`` in a fresh process: ru_maxrss never decreases, so a mode's peak RSS
+    is only its own when no earlier mode ran in the same process."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(run_mode, mode, pdfs, runs, llm_latency).result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the validation pipeline stage by stage.")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per mode")
+    parser.add_argument("--mode", choices=MODES + ("both",), default="both")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Folder searched recursively for PDFs")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Seconds the stub LLM takes per call")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--caches", action="store_true", help="Use the extraction and page caches (fresh, empty)")
+    parser.add_argument("--validation-workers", type=int, default=1, help="VALIDATION_WORKERS for the runs")
+    parser.add_argument("--page-workers", type=int, default=1, help="PAGE_CONVERSION_WORKERS for the runs")
+    args = parser.parse_args(argv)
+
+    # Read by app.config when each mode's process imports the pipeline
+    cache_dir = tempfile.mkdtemp(prefix="benchmark-cache-") if args.caches else None
+    os.environ.update({
+        "EXTRACTION_CACHE_ENABLED": "1" if args.caches else "0",
+        "PAGE_CACHE_ENABLED": "1" if args.caches else "0",
+        "VALIDATION_WORKERS": str(args.validation_workers),
+        "PAGE_CONVERSION_WORKERS": str(args.page_workers),
+    })
+    if cache_dir:
+        os.environ["EXTRACTION_CACHE_DIR"] = os.path.join(cache_dir, "extractions")
+        os.environ["PAGE_CACHE_DIR"] = os.path.join(cache_dir, "pages")
+
+    pdfs = find_sample_pdfs(args.data_dir)
+    if not pdfs:
+        parser.error(f"No PDFs found under {args.data_dir}")
+
+    report = {
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parserVersion": PARSER_VERSION,
+        "runs": args.runs,
+        "llmLatencySeconds": args.llm_latency,
+        "caches": args.caches,
+        "validationWorkers": args.validation_workers,
+        "pageConversionWorkers": args.page_workers,
+        "inputs": [{"category": category, "fileName": os.path.basename(path)} for category, path in pdfs],
+        "modes": {}
+    }
+    for mode in (MODES if args.mode == "both" else (args.mode,)):
+        if cache_dir:
+            # Every mode starts with empty caches
+            for name in ("extractions", "pages"):
+                shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)
+        report["modes"][mode] = run_mode_isolated(mode, pdfs, args.runs, args.llm_latency)
+    if cache_dir:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    report["peakRssBytes"] = max(result["peakRssBytes"] for result in report["modes"].values())
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        print(f"✅ Benchmark report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,44 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from app.converter_pool import init_converter_pool
+from app.jobs import job_manager
+from app.llm import init_llm
+from app.tools import shutdown_page_conversion_pool, shutdown_validation_pool, warm_page_conversion_pool
+from app.workspace import run_workspace_janitor
 from app.routes import router  # Ensure this import works (app/routes.py must exist)
 
+
+async def warm_up(app: FastAPI):
+    # Load docling models in the background; /ready reports 503 until they are loaded
+    await run_in_threadpool(init_converter_pool)
+    await run_in_threadpool(warm_page_conversion_pool)
+    init_llm()
+    app.state.ready = True
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.ready = False
+    job_manager.start()
+    warming = asyncio.create_task(warm_up(app))
+    janitor = asyncio.create_task(run_workspace_janitor())
+    yield
+    warming.cancel()
+    janitor.cancel()
+    job_manager.shutdown()
+    shutdown_validation_pool()
+    shutdown_page_conversion_pool()
+
+
 app = FastAPI(
     title="Financial Statement Validator",
     description="LangGraph Agent API for validating financial income statements from PDFs.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Include your validation route
@@ -15,3 +49,10 @@ app.include_router(router)
 def root():
     return {"message": "LangGraph Agent API for Financial Statement Validation"}
 
+
+# Readiness probe: only reports ready once the converter pool is warm
+@app.get("/ready")
+def ready():
+    if not getattr(app.state, "ready", False):
+        return JSONResponse(status_code=503, content={"ready": False})
+    return {"ready": True}
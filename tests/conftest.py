@@ -0,0 +1,36 @@
+import importlib.util
+import os
+import sys
+
+# Tests never touch the real caches, and run without docling's models: when docling is
+# not installed, a stub converter (tests/stubs/docling) stands in for it. Worker
+# processes are spawned with the same environment and sys.path, so they use it too.
+os.environ.setdefault("EXTRACTION_CACHE_ENABLED", "0")
+os.environ.setdefault("PAGE_CACHE_ENABLED", "0")
+os.environ.setdefault("SUMMARY_CACHE_BACKEND", "none")
+
+if importlib.util.find_spec("docling") is None:
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), "stubs"))
+
+import fitz
+import pytest
+
+STATEMENT_PAGE = """Statement of profit and loss
+| Particulars | Q3 FY25 | Q2 FY25 |
+|---|---|---|
+| Total Income | 5,000 | 4,800 |
+| Total Expenses | 1,500 | 1,400 |
+| Profit after tax | 3,500 | 3,400 |"""
+
+
+@pytest.fixture
+def statement_pdf(tmp_path):
+    """Factory for PDFs of ``pages`` identical Ind-AS statement pages."""
+    def make(name, pages=1):
+        path = tmp_path / name
+        with fitz.open() as doc:
+            for _ in range(pages):
+                doc.new_page().insert_text((40, 60), STATEMENT_PAGE, fontsize=9)
+            doc.save(path)
+        return {"fileName": name, "filePath": str(path), "submittedNetIncome": 3500}
+    return make
@@ -0,0 +1 @@
+"""Minimal stand-in for docling, used by the tests when docling is not installed."""
@@ -0,0 +1,13 @@
+import enum
+from dataclasses import dataclass
+from io import BytesIO
+
+
+class InputFormat(str, enum.Enum):
+    PDF = "pdf"
+
+
+@dataclass
+class DocumentStream:
+    name: str
+    stream: BytesIO
@@ -0,0 +1,12 @@
+class EasyOcrOptions:
+    def __init__(self, lang=None, force_full_page_ocr=False, scale=3.0):
+        self.lang = lang
+        self.force_full_page_ocr = force_full_page_ocr
+        self.scale = scale
+
+
+class PdfPipelineOptions:
+    def __init__(self):
+        self.do_ocr = True
+        self.do_table_structure = True
+        self.ocr_options = None
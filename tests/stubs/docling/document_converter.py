@@ -0,0 +1,51 @@
+import os
+import re
+import time
+
+import fitz
+
+# Document names steer the stub: "..._sleep3..." converts for 3 seconds,
+# "...crash..." kills the converting process
+SLEEP_PATTERN = re.compile(r"sleep(\d+(?:\.\d+)?)")
+
+
+class PdfFormatOption:
+    def __init__(self, pipeline_options=None):
+        self.pipeline_options = pipeline_options
+
+
+class StubDocument:
+    """Echoes each page's text, so a converted page reads like its source."""
+
+    def __init__(self, pages):
+        self.pages = {number: None for number in range(1, len(pages) + 1)}
+        self._pages = pages
+
+    def export_to_markdown(self, page_no=None):
+        if page_no is None:
+            return "\n\n".join(self._pages)
+        return self._pages[page_no - 1]
+
+
+class StubResult:
+    def __init__(self, document):
+        self.document = document
+
+
+class DocumentConverter:
+    def __init__(self, format_options=None):
+        self.format_options = format_options
+
+    def initialize_pipeline(self, input_format):
+        pass
+
+    def convert(self, source):
+        name = getattr(source, "name", str(source))
+        if "crash" in name:
+            os._exit(1)
+        delay = SLEEP_PATTERN.search(name)
+        if delay:
+            time.sleep(float(delay.group(1)))
+        stream = source.stream.getvalue() if hasattr(source, "stream") else open(source, "rb").read()
+        with fitz.open(stream=stream, filetype="pdf") as doc:
+            return StubResult(StubDocument([page.get_text() for page in doc]))
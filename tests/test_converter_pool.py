@@ -0,0 +1,26 @@
+import pytest
+
+from app import converter_pool
+from app.converter_pool import get_converter_pool, ocr_profile
+
+
+def test_requested_ocr_settings_snap_to_allowed_profiles():
+    assert ocr_profile(212, ["en"]) == (200, ("en",))
+    assert ocr_profile(72, ["en", "de", "en"]) == (100, ("de", "en"))
+    with pytest.raises(ValueError, match="ocrLanguages"):
+        ocr_profile(200, ["en", "xx"])
+    with pytest.raises(ValueError):
+        ocr_profile(200, [])
+
+
+def test_least_recently_used_ocr_profiles_are_dropped(monkeypatch):
+    monkeypatch.setattr(converter_pool, "_pools", converter_pool.OrderedDict())
+    monkeypatch.setattr(converter_pool, "OCR_CONVERTER_PROFILES", 2)
+    digital = get_converter_pool()
+    first = get_converter_pool((100, ("en",)))
+    get_converter_pool((150, ("en",)))
+    # Using a profile makes it the most recent one
+    assert get_converter_pool((100, ("en",))) is first
+    get_converter_pool((200, ("en",)))
+    assert list(converter_pool._pools) == [None, (100, ("en",)), (200, ("en",))]
+    assert get_converter_pool() is digital
@@ -0,0 +1,50 @@
+import time
+
+import pytest
+
+from app.jobs import JobManager
+
+
+def wait_for(manager, job, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        info = manager.get(job["jobId"])
+        if info["status"] in ("completed", "failed"):
+            return info
+        time.sleep(0.2)
+    pytest.fail(f"job {job['jobId']} did not finish")
+
+
+def test_jobs_keep_running_after_a_worker_dies(statement_pdf):
+    manager = JobManager(max_workers=1, max_queue_depth=4)
+    try:
+        crashed = wait_for(manager, manager.submit([statement_pdf("crash.pdf")], "none"))
+        assert crashed["status"] == "failed"
+        assert "worker process exited" in crashed["error"]
+
+        finished = wait_for(manager, manager.submit([statement_pdf("q3.pdf")], "none"))
+        assert finished["status"] == "completed"
+        assert [entry["netIncome"] for entry in finished["result"]["results"]] == [3500.0]
+    finally:
+        manager.shutdown()
+
+
+def test_job_summaries_use_the_api_process_bulk_lane(statement_pdf, monkeypatch):
+    from app import tools
+
+    calls = []
+
+    def summary(results, mode, priority):
+        calls.append((len(results), mode, priority))
+        return "bulk summary"
+
+    # Patched here, in the API process: the worker only validates
+    monkeypatch.setattr(tools, "generate_summary", summary)
+    manager = JobManager(max_workers=1, max_queue_depth=4)
+    try:
+        finished = wait_for(manager, manager.submit([statement_pdf("q3.pdf")], "llm"))
+        assert finished["status"] == "completed"
+        assert finished["result"]["summary"] == "bulk summary"
+        assert calls == [(1, "llm", "bulk")]
+    finally:
+        manager.shutdown()
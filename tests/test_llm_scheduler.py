@@ -0,0 +1,57 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from app.llm_scheduler import SummaryScheduler
+
+
+class GatedLLM:
+    """Stub LLM whose calls wait for ``gate``; records the prompts in call order."""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.calls = []
+
+    def invoke(self, messages):
+        self.calls.append(messages[0].content)
+        self.gate.wait(10)
+        return SimpleNamespace(content=f"summary of {messages[0].content}")
+
+    def stream(self, messages):
+        self.calls.append(messages[0].content)
+        self.gate.wait(10)
+        yield SimpleNamespace(content="streamed")
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_interactive_lane_overtakes_queued_bulk_work():
+    llm = GatedLLM()
+    scheduler = SummaryScheduler(window=0, max_concurrency=1, llm_factory=lambda: llm)
+    first = scheduler.submit("bulk 1", "bulk")
+    wait_until(lambda: llm.calls)
+    bulk = scheduler.submit("bulk 2", "bulk")
+    interactive = scheduler.submit("interactive", "interactive")
+    llm.gate.set()
+    for future in (first, bulk, interactive):
+        future.result(10)
+    assert llm.calls == ["bulk 1", "interactive", "bulk 2"]
+
+
+def test_streams_hold_a_concurrency_slot():
+    llm = GatedLLM()
+    scheduler = SummaryScheduler(window=0, max_concurrency=1, llm_factory=lambda: llm)
+    stream = threading.Thread(target=lambda: list(scheduler.stream("streamed prompt")))
+    stream.start()
+    wait_until(lambda: llm.calls)
+    queued = scheduler.submit("batched prompt")
+    time.sleep(0.2)
+    # The only slot is taken by the stream
+    assert llm.calls == ["streamed prompt"]
+    llm.gate.set()
+    stream.join(10)
+    assert queued.result(10) == "summary of batched prompt"
@@ -0,0 +1,28 @@
+from app.metrics import compute_metrics
+
+
+def row(file_name, quarter, net_income):
+    return {"fileName": file_name, "quarter": quarter, "revenues": 1000.0, "expenses": 0.0, "netIncome": net_income}
+
+
+def test_growth_compares_periods_within_one_file():
+    metrics = compute_metrics([
+        row("a.pdf", "Q2 FY25", 100.0),
+        row("a.pdf", "Q3 FY25", 150.0),
+        row("b.pdf", "Q2 FY24", 400.0),
+        row("b.pdf", "Q2 FY25", 500.0),
+    ])
+    assert metrics["qoqGrowthPercent"].tolist()[1] == 50.0
+    assert metrics["yoyGrowthPercent"].tolist()[3] == 25.0
+    # a.pdf's Q2 FY25 is never the baseline for b.pdf, or the other way round
+    assert metrics["qoqGrowthPercent"].isna().tolist() == [True, False, True, True]
+    assert metrics["yoyGrowthPercent"].isna().tolist() == [True, True, True, False]
+
+
+def test_growth_is_na_when_the_baseline_period_is_ambiguous():
+    metrics = compute_metrics([
+        row("a.pdf", "Q2 FY25", 100.0),
+        row("a.pdf", "Q2 FY25", 90.0),
+        row("a.pdf", "Q3 FY25", 150.0),
+    ])
+    assert metrics["qoqGrowthPercent"].isna().all()
@@ -0,0 +1,49 @@
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import fitz
+import pytest
+
+from app import tools
+
+
+@pytest.fixture
+def shard_pool(monkeypatch):
+    monkeypatch.setattr(tools, "PAGE_CONVERSION_WORKERS", 2)
+    monkeypatch.setattr(tools, "PAGE_SHARD_SIZE", 2)
+    monkeypatch.setattr(tools, "VALIDATION_FILE_TIMEOUT", 3)
+    tools.warm_page_conversion_pool()
+    yield
+    tools.shutdown_page_conversion_pool()
+
+
+@pytest.fixture
+def document():
+    with fitz.open() as doc:
+        for number in range(7):
+            doc.new_page().insert_text((40, 60), f"Page {number}")
+        yield doc
+
+
+def test_shards_merge_in_page_order(shard_pool, document):
+    pages = [0, 2, 3, 4, 5, 6]
+    markdown = tools.convert_changed_pages(document, pages, "report.pdf")
+    assert [text.strip() for text in markdown] == [f"Page {number}" for number in pages]
+
+
+def test_one_deadline_for_the_whole_document(shard_pool, document, monkeypatch):
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        tools.convert_changed_pages(document, list(range(7)), "report_sleep30.pdf")
+    # Four shards on two workers: the deadline is per document, not per shard
+    assert time.monotonic() - start < 10
+    # The stuck workers were recycled; the next document gets a fresh (cold) pool
+    monkeypatch.setattr(tools, "VALIDATION_FILE_TIMEOUT", 120)
+    assert len(tools.convert_changed_pages(document, list(range(7)), "report.pdf")) == 7
+
+
+def test_pool_is_rebuilt_after_a_worker_dies(shard_pool, document, monkeypatch):
+    monkeypatch.setattr(tools, "VALIDATION_FILE_TIMEOUT", 120)
+    with pytest.raises(BrokenProcessPool):
+        tools.convert_changed_pages(document, list(range(7)), "crash.pdf")
+    assert len(tools.convert_changed_pages(document, list(range(7)), "report.pdf")) == 7
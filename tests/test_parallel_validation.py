@@ -0,0 +1,46 @@
+import time
+
+import pytest
+
+from app import converter_pool, tools
+
+
+@pytest.fixture(autouse=True)
+def fresh_validation_pool():
+    tools.shutdown_validation_pool()
+    yield
+    tools.shutdown_validation_pool()
+
+
+def test_queued_files_do_not_time_out(statement_pdf):
+    # Three 3-second files on two workers: the third waits in the call queue (and the
+    # workers start up) for longer than it runs, which must not count against it
+    requests = [statement_pdf(f"q{i}_sleep3.pdf") for i in range(3)]
+    results = tools.validate_pdfs_in_parallel(requests, max_workers=2, file_timeout=8)
+    assert [entry.get("error") for entry in results] == [None, None, None]
+    assert [entry["fileName"] for entry in results] == ["q0_sleep3.pdf", "q1_sleep3.pdf", "q2_sleep3.pdf"]
+    assert all(entry["isValid"] for entry in results)
+
+
+def test_slow_file_times_out_and_the_others_finish(statement_pdf):
+    requests = [statement_pdf("slow_sleep60.pdf"), statement_pdf("a.pdf"), statement_pdf("b.pdf")]
+    start = time.monotonic()
+    results = tools.validate_pdfs_in_parallel(requests, max_workers=2, file_timeout=4)
+    assert time.monotonic() - start < 60
+    assert results[0] == {"fileName": "slow_sleep60.pdf", "error": "Timed out after 4 seconds"}
+    assert [entry["netIncome"] for entry in results[1:]] == [3500.0, 3500.0]
+    # The recycled pool keeps serving requests
+    assert tools.validate_pdfs_in_parallel(requests[1:], max_workers=2, file_timeout=4)[0]["isValid"]
+
+
+def test_worker_processes_validate_files_serially(statement_pdf, monkeypatch):
+    def nested_pool(max_workers):
+        raise AssertionError("a worker process started a nested validation pool")
+
+    monkeypatch.setattr(converter_pool, "_worker_process", True)
+    monkeypatch.setattr(tools, "get_validation_pool", nested_pool)
+    requests = [statement_pdf("a.pdf"), statement_pdf("b.pdf")]
+    results = tools.validate_uploaded_pdfs.func(requests, max_workers=2)
+    assert [entry["fileName"] for entry in results] == ["a.pdf", "b.pdf"]
+    streamed = tools.iter_validated_pdfs(requests, max_workers=2)
+    assert [file_results[0]["fileName"] for _, file_results in streamed] == ["a.pdf", "b.pdf"]
@@ -0,0 +1,38 @@
+import json
+import pickle
+
+import pytest
+
+from app.records import FastJSONResponse, ValidationRow
+
+
+def make_row():
+    return ValidationRow(
+        quarter="Q3 FY25",
+        revenues=5000.0,
+        expenses=1500.0,
+        netIncome=3500.0,
+        submittedNetIncome=3500.0,
+        isValid=True,
+        fileName="statement.pdf",
+        stageTimingsSeconds={"table_parsing": 0.01}
+    )
+
+
+def test_row_survives_pickle():
+    row = make_row()
+    assert pickle.loads(pickle.dumps(row)) == row
+
+
+def test_row_renders_as_json_object():
+    row = make_row()
+    body = json.loads(FastJSONResponse(content={"results": [row]}).body)
+    assert body["results"] == [row.to_dict()]
+
+
+def test_unknown_key_is_rejected():
+    row = make_row()
+    row["netIncome"] = 3400.0
+    assert row.netIncome == 3400.0
+    with pytest.raises(KeyError, match="declare it in app/records.py"):
+        row["confidence"] = 0.9
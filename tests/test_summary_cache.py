@@ -0,0 +1,21 @@
+import os
+
+import pytest
+
+from app.summary_cache import SQLiteSummaryCache
+
+
+def open_files():
+    return len(os.listdir("/proc/self/fd"))
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="counts open files through /proc")
+def test_sqlite_cache_closes_its_connections(tmp_path):
+    cache = SQLiteSummaryCache(str(tmp_path / "summaries.sqlite3"))
+    cache.set("warm-up", "summary")
+    before = open_files()
+    for i in range(50):
+        cache.set(f"key {i}", f"summary {i}")
+        assert cache.get(f"key {i}") == f"summary {i}"
+    assert open_files() == before
+    assert cache.get("missing") is None
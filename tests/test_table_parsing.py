@@ -0,0 +1,16 @@
+from app.tools import extract_income_tables_from_markdown, parse_income_statement_tables
+
+STATEMENT = """
+| Particulars | Q3 FY25 | Q2 FY25 |
+|---|---|---|
+| Total Income | 5,000 | 4,800 |
+| Total Expenses | (1,500) | (1,400) |
+| Profit after tax | 3,500 | 3,400 |
+"""
+
+
+def test_parenthesised_expenses_are_deducted():
+    rows = parse_income_statement_tables(extract_income_tables_from_markdown(STATEMENT))
+    assert len(rows) == 1
+    assert rows[0]["expenses"] == 1500.0
+    assert rows[0]["grossProfit"] == 3500.0
@@ -0,0 +1,30 @@
+from app import tools
+from app.tracing import STAGE_DURATION, collect_stage_observations, replay_stage_observations, span
+
+
+def stage_count(stage):
+    series = STAGE_DURATION._series.get(stage)
+    return series["count"] if series else 0
+
+
+def test_worker_spans_are_observed_once_per_span(statement_pdf):
+    # Two uploads with the same name are still two files
+    requests = [statement_pdf("q3.pdf"), dict(statement_pdf("q3_copy.pdf"), fileName="q3.pdf")]
+    before = {stage: stage_count(stage) for stage in ("validate_file", "docling.convert")}
+    try:
+        results = tools.validate_pdfs_in_parallel(requests, max_workers=2, file_timeout=60)
+    finally:
+        tools.shutdown_validation_pool()
+    assert [entry["fileName"] for entry in results] == ["q3.pdf", "q3.pdf"]
+    assert {stage: stage_count(stage) - before[stage] for stage in before} == {"validate_file": 2, "docling.convert": 2}
+
+
+def test_replayed_observations_keep_each_span():
+    with collect_stage_observations() as observations:
+        for _ in range(3):
+            with span("test.stage"):
+                pass
+    before = stage_count("test.stage")
+    replay_stage_observations(observations)
+    assert len(observations) == 3
+    assert stage_count("test.stage") - before == 3